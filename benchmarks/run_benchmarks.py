@@ -0,0 +1,198 @@
+"""
+Benchmark harness for KmerStore and the structures package.
+
+Generates seeded DNA datasets with malloclabs/generate_dna.py, times the
+KmerStore operations and the core DynamicArray, BitVector and
+DoublyLinkedList operations across a range of sizes, and writes the
+results as JSON: throughput per operation, peak memory of the load, and
+an empirical scaling exponent per operation (the slope of log(time)
+against log(size) between consecutive sizes; ~1 means linear, ~0 means
+constant per call).
+
+Run from the repository root:
+    python -m benchmarks.run_benchmarks --sizes 1000 4000 16000 --k 11 21 --output bench.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from malloclabs.generate_dna import DNA
+from malloclabs.kmer_structure import KmerStore
+from structures.bit_vector import BitVector
+from structures.dynamic_array import DynamicArray
+from structures.linked_list import DoublyLinkedList
+
+
+def _time(fn: Callable[[], Any]) -> float:
+    """Wall-clock seconds taken by fn()."""
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _peak_memory(fn: Callable[[], Any]) -> int:
+    """Peak bytes allocated by Python while running fn()."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _result(ops: int, seconds: float) -> dict[str, float]:
+    return {
+        "ops": ops,
+        "seconds": seconds,
+        "ops_per_second": ops / seconds if seconds > 0 else math.inf,
+    }
+
+
+def write_dataset(path: str, number: int, length: int, seed: int) -> None:
+    """Write `number` sequences of `length` bases, reproducibly for a given seed."""
+    random.seed(seed)
+    with open(path, "w") as file:
+        for _ in range(number):
+            file.write(DNA(length) + "\n")
+
+
+def bench_kmer_store(path: str, k: int, queries: int, batch: int, seed: int,
+                     store_args: dict[str, Any], memory: bool) -> dict[str, Any]:
+    """Time every KmerStore operation on one dataset."""
+    rng = random.Random(seed)
+    results = {}
+
+    store = KmerStore(k, **store_args)
+    results["read"] = {"seconds": _time(lambda: store.read(path))}
+    if memory:
+        results["read"]["peak_bytes"] = _peak_memory(lambda: KmerStore(k, **store_args).read(path))
+    results["distinct_kmers"] = len(store.freq_geq(1))
+
+    probes = ["".join(rng.choice("ACGT") for _ in range(k)) for _ in range(queries)]
+    batch_kmers = ["".join(rng.choice("ACGT") for _ in range(k)) for _ in range(batch)]
+
+    results["count"] = _result(queries, _time(lambda: [store.count(q) for q in probes]))
+    results["count_geq"] = _result(queries, _time(lambda: [store.count_geq(q) for q in probes]))
+    results["compatible"] = _result(queries, _time(lambda: [store.compatible(q) for q in probes]))
+    thresholds = [1, 2, 4, 8, 16]
+    results["freq_geq"] = _result(len(thresholds),
+                                  _time(lambda: [store.freq_geq(m) for m in thresholds]))
+    results["batch_insert"] = _result(batch, _time(lambda: store.batch_insert(batch_kmers)))
+    results["batch_delete"] = _result(batch, _time(lambda: store.batch_delete(batch_kmers)))
+    return results
+
+
+def bench_structures(n: int) -> dict[str, Any]:
+    """Time the core operations of the structures package on n elements."""
+    results = {}
+
+    array = DynamicArray()
+    results["dynamic_array.append"] = _result(n, _time(lambda: [array.append(i) for i in range(n)]))
+    results["dynamic_array.get_at"] = _result(n, _time(lambda: [array.get_at(i) for i in range(n)]))
+    results["dynamic_array.set_at"] = _result(n, _time(lambda: [array.set_at(i, i) for i in range(n)]))
+    front = DynamicArray()
+    results["dynamic_array.prepend"] = _result(n, _time(lambda: [front.prepend(i) for i in range(n)]))
+    shuffled = DynamicArray()
+    for value in random.Random(n).sample(range(n), n):
+        shuffled.append(value)
+    results["dynamic_array.sort"] = _result(n, _time(shuffled.sort))
+
+    bits = BitVector()
+    results["bit_vector.append"] = _result(n, _time(lambda: [bits.append(i & 1) for i in range(n)]))
+    results["bit_vector.get_at"] = _result(n, _time(lambda: [bits.get_at(i) for i in range(n)]))
+    results["bit_vector.set_at"] = _result(n, _time(lambda: [bits.set_at(i) for i in range(n)]))
+
+    linked = DoublyLinkedList()
+    results["linked_list.insert_to_back"] = _result(
+        n, _time(lambda: [linked.insert_to_back(i) for i in range(n)]))
+    results["linked_list.insert_to_front"] = _result(
+        n, _time(lambda: [linked.insert_to_front(i) for i in range(n)]))
+    results["linked_list.remove_from_front"] = _result(
+        n, _time(lambda: [linked.remove_from_front() for _ in range(n)]))
+    return results
+
+
+def scaling(sizes: list[int], runs: list[dict[str, Any]]) -> dict[str, list[float]]:
+    """
+    Slope of log(seconds) against log(size) between consecutive sizes
+    for every timed operation.
+    """
+    curves = {}
+    for name, first in runs[0].items():
+        if not isinstance(first, dict) or "seconds" not in first:
+            continue
+        slopes = []
+        for i in range(1, len(runs)):
+            before, after = runs[i - 1][name]["seconds"], runs[i][name]["seconds"]
+            if before > 0 and after > 0 and sizes[i] != sizes[i - 1]:
+                slopes.append(math.log(after / before) / math.log(sizes[i] / sizes[i - 1]))
+        curves[name] = slopes
+    return curves
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark KmerStore and the structures package.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 8000],
+                        help="Numbers of sequences per dataset.")
+    parser.add_argument("--length", type=int, default=100, help="Length of each sequence.")
+    parser.add_argument("--k", type=int, nargs="+", default=[11], help="k values to benchmark.")
+    parser.add_argument("--queries", type=int, default=10000, help="Point queries per operation.")
+    parser.add_argument("--batch", type=int, default=10000, help="k-mers per batch insert/delete.")
+    parser.add_argument("--seed", type=int, default=3506, help="Seed for data and queries.")
+    parser.add_argument("--packed", action="store_true", help="Use the packed k-mer representation.")
+    parser.add_argument("--engine", default="python", help="KmerStore engine to benchmark.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc load pass.")
+    parser.add_argument("--output", type=str, default="-", help="JSON output path (- for stdout).")
+    args = parser.parse_args()
+
+    store_args = {"packed": args.packed, "engine": args.engine}
+    report = {
+        "config": vars(args),
+        "python": sys.version,
+        "kmer_store": {},
+        "structures": {},
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for k in args.k:
+            runs = []
+            for number in args.sizes:
+                path = os.path.join(workdir, f"dna_{number}.txt")
+                if not os.path.exists(path):
+                    write_dataset(path, number, args.length, args.seed + number)
+                result = bench_kmer_store(path, k, args.queries, args.batch, args.seed,
+                                          store_args, not args.no_memory)
+                result["kmers_in_file"] = number * max(0, args.length - k + 1)
+                runs.append(result)
+            report["kmer_store"][f"k={k}"] = {
+                "sizes": args.sizes,
+                "runs": runs,
+                "scaling": scaling([run["kmers_in_file"] for run in runs], runs),
+            }
+
+    element_counts = [number * args.length for number in args.sizes]
+    runs = [bench_structures(n) for n in element_counts]
+    report["structures"] = {
+        "sizes": element_counts,
+        "runs": runs,
+        "scaling": scaling(element_counts, runs),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+MallocLabs K-mer Querying Structure: bounded-memory approximate counting
+"""
+
+from malloclabs.kmer_structure import (READ_CHUNK_SIZE, _canonical_kmer, _pack_kmer, _read_chunks,
+                                      _RollingScanner, _unpack_kmer)
+from structures.bloom_filter import BloomFilter
+from structures.count_min_sketch import CountMinSketch
+
+
+class ApproxKmerStore:
+    """
+    Counts k-mers in a fixed amount of memory, independent of how many
+    distinct k-mers the input holds.
+
+    The first occurrence of a k-mer only goes into a Bloom filter, so
+    the (usually very many) singletons never touch the counters; every
+    later occurrence goes into a Count-Min sketch. count(kmer) is then
+    1 + sketch estimate when the filter contains the k-mer, else 0.
+
+    Error bounds, with N the number of repeat occurrences added to the
+    sketch (sketch_total()):
+      * a k-mer that occurred c >= 1 times: c <= count <= c + epsilon * N,
+        the upper bound holding with probability at least 1 - delta;
+      * a k-mer that never occurred: count is 0 except with probability
+        about fp_rate (once expected_kmers distinct k-mers were seen),
+        in which case it is bounded as if it had occurred once.
+
+    freq_geq needs to know which k-mers to report, so the store keeps
+    every k-mer whose estimate reaches track_threshold. That is roughly
+    (number of k-mers read) / track_threshold k-mers, and freq_geq(m) is
+    only available for m >= track_threshold.
+    """
+
+    def __init__(self, k: int, epsilon: float = 1e-4, delta: float = 0.01,
+                 expected_kmers: int = 1_000_000, fp_rate: float = 0.01,
+                 track_threshold: int | None = None, canonical: bool = False) -> None:
+        self.k = k
+        self.canonical = canonical
+        self.track_threshold = track_threshold
+        self.sketch = CountMinSketch.for_error(epsilon, delta)
+        self.seen = BloomFilter.for_capacity(expected_kmers, fp_rate)
+        self.heavy = set()  # Codes whose estimate reached track_threshold
+
+    def _encode(self, kmer: str) -> int:
+        """Pack a k-mer (canonicalised if needed) into its 2-bit code."""
+        return _pack_kmer(_canonical_kmer(kmer) if self.canonical else kmer)
+
+    def _add(self, code: int) -> None:
+        if code not in self.seen:
+            self.seen.add(code)
+            if self.track_threshold is not None and self.track_threshold <= 1:
+                self.heavy.add(code)  # One occurrence already reaches the threshold
+            return
+        estimate = self.sketch.add(code)
+        if self.track_threshold is not None and estimate + 1 >= self.track_threshold:
+            self.heavy.add(code)
+
+    def read(self, infile: str, chunk_size: int = READ_CHUNK_SIZE, use_mmap: bool = False) -> None:
+        """
+        Stream the k-mers of a file into the sketch in a single pass.
+        Memory use does not grow with the size of the input.
+        """
+        scanner = _RollingScanner(self.k, self.canonical)
+        for chunk in _read_chunks(infile, chunk_size, use_mmap):
+            for code in scanner.feed(chunk):
+                self._add(code)
+
+    def batch_insert(self, kmers: list[str]) -> None:
+        """Add a list of k-mers (including all duplicates)."""
+        for kmer in kmers:
+            self._add(self._encode(kmer))
+
+    def count(self, kmer: str) -> int:
+        """
+        Estimated number of times the k-mer occurred; see the class
+        docstring for the error bounds. Never an underestimate.
+        """
+        code = self._encode(kmer)
+        if code not in self.seen:
+            return 0
+        return 1 + self.sketch.estimate(code)
+
+    def freq_geq(self, m: int) -> list[str]:
+        """
+        Return the tracked k-mers whose estimated count is >= m, in
+        sorted order. Every k-mer that truly occurs >= m times is
+        included; k-mers whose estimate is inflated by up to epsilon * N
+        may be included as well.
+        """
+        if self.track_threshold is None or m < self.track_threshold:
+            raise ValueError(f"freq_geq needs m >= track_threshold ({self.track_threshold})")
+        result = [code for code in self.heavy if 1 + self.sketch.estimate(code) >= m]
+        result.sort()
+        return [_unpack_kmer(code, self.k) for code in result]
+
+    def sketch_total(self) -> int:
+        """Number of repeat occurrences counted by the sketch (N above)."""
+        return self.sketch.total()
@@ -0,0 +1,85 @@
+"""
+MallocLabs K-mer Querying Structure: snapshot-isolated concurrent access
+"""
+
+import threading
+from typing import Any
+
+from malloclabs.kmer_structure import KmerStore
+
+
+class ConcurrentKmerStore:
+    """
+    A KmerStore that can be queried from any number of threads while
+    batches are being loaded.
+
+    Readers never take a lock: every query runs against the currently
+    published version, which is never modified again. Writers are
+    serialised by a lock; each one copies the current version, applies
+    its change to the copy off to the side and then publishes the copy
+    with a single reference assignment, so a reader sees either the
+    whole batch or none of it.
+
+    Each write pays an O(n) copy on top of the operation itself, which
+    is the same order as the merge that batch_insert/batch_delete
+    already perform.
+    """
+
+    def __init__(self, k: int, **kwargs: Any) -> None:
+        """Keyword arguments (packed, canonical, engine, ...) go to KmerStore."""
+        self._current = KmerStore(k, **kwargs)
+        self._write_lock = threading.Lock()
+
+    def snapshot(self) -> Any:
+        """
+        Return the currently published version. It is safe to run any
+        number of queries on it; they will all see the same data, even
+        if newer versions are published in the meantime.
+        """
+        return self._current
+
+    def _publish(self, method: str, *args: Any, **kwargs: Any) -> None:
+        """Apply a mutating KmerStore method to a copy and publish it."""
+        with self._write_lock:
+            following = self._current.copy()
+            getattr(following, method)(*args, **kwargs)
+            self._current = following
+
+    def read(self, infile: str, **kwargs: Any) -> None:
+        self._publish("read", infile, **kwargs)
+
+    def read_parallel(self, infiles: str | list[str], **kwargs: Any) -> None:
+        self._publish("read_parallel", infiles, **kwargs)
+
+    def ingest(self, sources: str | list[str], **kwargs: Any) -> None:
+        self._publish("ingest", sources, **kwargs)
+
+    def batch_insert(self, kmers: list[str]) -> None:
+        self._publish("batch_insert", kmers)
+
+    def batch_delete(self, kmers: list[str]) -> None:
+        self._publish("batch_delete", kmers)
+
+    def count(self, kmer: str) -> int:
+        return self._current.count(kmer)
+
+    def count_geq(self, kmer: str) -> int:
+        return self._current.count_geq(kmer)
+
+    def count_many(self, kmers: list[str]) -> list[int]:
+        return self._current.count_many(kmers)
+
+    def count_geq_many(self, kmers: list[str]) -> list[int]:
+        return self._current.count_geq_many(kmers)
+
+    def freq_geq(self, m: int) -> list[str]:
+        return self._current.freq_geq(m)
+
+    def compatible(self, kmer: str) -> int:
+        return self._current.compatible(kmer)
+
+    def compatible_many(self, kmers: list[str]) -> list[int]:
+        return self._current.compatible_many(kmers)
+
+    def save(self, path: str) -> None:
+        self._current.save(path)
@@ -5,12 +5,123 @@ Joel Mackenzie and Vladimir Morozov
 """
 
 import argparse
+import os
 import random
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
 
+# Each random byte holds four bases, two bits each. TABLES[i] maps a byte
+# to the base encoded by bits 2i..2i+1, so four bytes.translate calls turn
+# a buffer of random bytes into bases without a Python-level loop.
+_TABLES = [bytes(b"ACGT"[(byte >> (2 * i)) & 3] for byte in range(256)) for i in range(4)]
 
-def DNA(length: int) -> str:
-    return "".join(random.choice("ACGT") for _ in range(length))
+BLOCK_BYTES = 1 << 22  # Roughly how much sequence data one task produces
+
+
+def dna_bytes(length: int, rng: Any = random) -> bytes:
+    """Return `length` uniformly random bases as ASCII bytes."""
+    raw = rng.randbytes((length + 3) // 4)
+    out = bytearray(len(raw) * 4)
+    for i, table in enumerate(_TABLES):
+        out[i::4] = raw.translate(table)
+    del out[length:]
+    return bytes(out)
+
+
+def DNA(length: int, rng: Any = random) -> str:
+    return dna_bytes(length, rng).decode("ascii")
+
+
+def _block_rng(seed: int, block: int) -> random.Random:
+    """Each block gets its own generator, so output does not depend on --workers."""
+    return random.Random(f"{seed}/{block}")
+
+
+def _generate_block(task: tuple) -> bytes:
+    """
+    Produce the output for sequences [first, first + count) of one block,
+    overwriting the planted k-mers that fall inside it.
+    """
+    seed, block, first, count, length, fasta, line_width, plants = task
+    bases = bytearray(dna_bytes(count * length, _block_rng(seed, block)))
+    for sequence, offset, kmer in plants:
+        start = (sequence - first) * length + offset
+        bases[start:start + len(kmer)] = kmer
+
+    parts = []
+    for i in range(count):
+        sequence = bases[i * length:(i + 1) * length]
+        if fasta:
+            parts.append(b">seq%d\n" % (first + i))
+            if line_width > 0:
+                for start in range(0, length, line_width):
+                    parts.append(sequence[start:start + line_width])
+                    parts.append(b"\n")
+                continue
+        parts.append(sequence)
+        parts.append(b"\n")
+    return b"".join(parts)
+
+
+def plan_plants(plants: list[tuple[str, int]], number: int, length: int,
+                seed: int) -> list[tuple[int, int, bytes]]:
+    """
+    Pick (sequence, offset, k-mer) positions so that each planted k-mer
+    is written the requested number of times. Positions are drawn from
+    the seed, so they are reproducible. Plants that happen to overlap
+    overwrite each other, so a k-mer can end up slightly below its
+    requested count; the random bases around it can also add copies.
+    """
+    rng = random.Random(f"{seed}/plants")
+    positions = []
+    for kmer, times in plants:
+        if len(kmer) > length:
+            raise ValueError(f"planted k-mer {kmer} is longer than the sequences")
+        for _ in range(times):
+            positions.append((rng.randrange(number), rng.randrange(length - len(kmer) + 1),
+                              kmer.encode("ascii")))
+    return positions
+
+
+def generate(output: str, number: int, length: int, seed: int, workers: int = 1,
+             fasta: bool = False, line_width: int = 0,
+             plants: list[tuple[str, int]] | None = None) -> None:
+    """
+    Write `number` random sequences of `length` bases to `output`. The
+    file only depends on the seed and the arguments, not on `workers`.
+    """
+    per_block = max(1, BLOCK_BYTES // max(1, length))
+    blocks = [(block, first, min(per_block, number - first))
+              for block, first in enumerate(range(0, number, per_block))]
+    planted = [[] for _ in blocks]
+    for sequence, offset, kmer in plan_plants(plants or [], number, length, seed):
+        planted[sequence // per_block].append((sequence, offset, kmer))
+    tasks = [(seed, block, first, count, length, fasta, line_width, planted[block])
+             for block, first, count in blocks]
+
+    with open(output, "wb", buffering=1 << 20) as file:
+        if workers <= 1:
+            for task in tasks:
+                file.write(_generate_block(task))
+            return
+        # Keep a bounded number of blocks in flight and write them in order
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(_generate_block, task))
+                if len(pending) >= 2 * workers:
+                    file.write(pending.popleft().result())
+            while pending:
+                file.write(pending.popleft().result())
+
+
+def _parse_plant(text: str) -> tuple[str, int]:
+    kmer, _, times = text.partition(":")
+    if not kmer or set(kmer) - set("ACGT") or not times.isdigit():
+        raise argparse.ArgumentTypeError(f"expected KMER:COUNT, got {text!r}")
+    return kmer, int(times)
 
 
 if __name__ == "__main__":
@@ -28,6 +139,22 @@ if __name__ == "__main__":
     parser.add_argument(
         "--output", type=str, required=True, help="Output file to write the sequences."
     )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed for reproducible output (random if omitted)."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of processes generating blocks."
+    )
+    parser.add_argument(
+        "--fasta", action="store_true", help="Write FASTA records instead of one sequence per line."
+    )
+    parser.add_argument(
+        "--line-width", type=int, default=0, help="Wrap FASTA sequences at this width (0 = no wrap)."
+    )
+    parser.add_argument(
+        "--plant", type=_parse_plant, action="append", default=[],
+        help="Plant a known k-mer COUNT times, as KMER:COUNT. May be repeated."
+    )
     args = parser.parse_args()
 
     # No arguments passed
@@ -35,8 +162,6 @@ if __name__ == "__main__":
         parser.print_help()
         sys.exit(-1)
 
-# Open the output file in write mode
-    with open(args.output, "w") as file:
-        # Generate...
-        for _ in range(args.number):
-            file.write(DNA(args.length) + "\n")
+    seed = args.seed if args.seed is not None else int.from_bytes(os.urandom(8), "little")
+    generate(args.output, args.number, args.length, seed, args.workers,
+             args.fasta, args.line_width, args.plant)
@@ -0,0 +1,173 @@
+"""
+MallocLabs K-mer Querying Structure: on-disk snapshots
+
+A snapshot holds everything KmerStore needs to answer queries, laid out
+so it can be memory-mapped and read in place:
+
+    header       "<8sIIIIQ": magic, version, k, flags, prefix slots, n
+    prefix_count prefix slots x uint64
+    kmers        n x uint64, packed 2 bits per base, sorted
+    frequency    n x uint64
+    cumulative   n x uint64, cumulative[i] = frequency[0] + ... + frequency[i]
+
+All sections are 8-byte aligned and the arrays are stored little-endian.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from typing import Any, Iterable, Iterator
+
+MAGIC = b"KMERSNAP"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIIQ")
+MAX_K = 32  # A packed k-mer must fit in 64 bits
+
+FLAG_CANONICAL = 1  # Keys are canonical (min of k-mer and reverse complement)
+
+_WRITE_BLOCK = 1 << 16
+
+
+def _write_uint64s(file: Any, values: Iterable[int]) -> None:
+    """Write integers as little-endian uint64, a block at a time."""
+    block = array("Q")
+    for value in values:
+        block.append(value)
+        if len(block) == _WRITE_BLOCK:
+            _flush_block(file, block)
+            block = array("Q")
+    _flush_block(file, block)
+
+
+def _flush_block(file: Any, block: array) -> None:
+    if sys.byteorder != "little":
+        block.byteswap()
+    block.tofile(file)
+
+
+def write_snapshot(path: str, k: int, flags: int, prefix_count: list[int],
+                   kmers: Iterable[int], frequency: list[int]) -> None:
+    """
+    Write a snapshot file. kmers must be sorted packed codes and
+    frequency the matching counts.
+    """
+    if k > MAX_K:
+        raise ValueError(f"snapshots support k <= {MAX_K}, got {k}")
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, k, flags, len(prefix_count), len(frequency)))
+        _write_uint64s(file, prefix_count)
+        _write_uint64s(file, kmers)
+        _write_uint64s(file, frequency)
+
+        def running_total() -> Iterable[int]:
+            total = 0
+            for count in frequency:
+                total += count
+                yield total
+
+        _write_uint64s(file, running_total())
+
+
+class MappedArray:
+    """
+    Read-only, array-like view over a uint64 section of a mapped
+    snapshot, exposing the DynamicArray query methods KmerStore uses.
+    """
+    def __init__(self, view: memoryview) -> None:
+        self._view = view
+        self._size = len(view)
+
+    def get_at(self, index: int) -> int | None:
+        if 0 <= index < self._size:
+            return self._view[index]
+        return None
+
+    def __getitem__(self, index: int) -> int | None:
+        return self.get_at(index)
+
+    def get_size(self) -> int:
+        return self._size
+
+    def is_empty(self) -> bool:
+        return self._size == 0
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._view)
+
+    def to_list(self) -> list[int]:
+        return self._view.tolist()
+
+
+class MappedCumulative:
+    """
+    Stands in for KmerStore's FenwickTree on a mapped snapshot, answering
+    prefix sums from the stored cumulative counts in O(1).
+    """
+    def __init__(self, view: memoryview) -> None:
+        self._view = view
+        self._size = len(view)
+
+    def prefix_sum(self, index: int) -> int:
+        index = min(index, self._size)
+        return self._view[index - 1] if index > 0 else 0
+
+    def total(self) -> int:
+        return self._view[self._size - 1] if self._size > 0 else 0
+
+    def get_size(self) -> int:
+        return self._size
+
+
+class Snapshot:
+    """
+    A memory-mapped snapshot file. The prefix_count, kmers, frequency and
+    cumulative attributes read straight from the page cache, so any number of
+    processes opening the same file share one physical copy.
+    """
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is not a k-mer snapshot")
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is not a k-mer snapshot")
+        magic, version, k, flags, prefix_slots, n = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} k-mer snapshot")
+        if sys.byteorder != "little":
+            self.close()
+            raise ValueError("snapshots can only be mapped on little-endian machines")
+        if len(self._map) != HEADER.size + 8 * (prefix_slots + 3 * n):
+            # Truncated or padded: the sections would not line up with the header
+            self.close()
+            raise ValueError(f"{path} is not a k-mer snapshot")
+
+        self.k = k
+        self.flags = flags
+        self._view = memoryview(self._map)
+        words = self._view[HEADER.size:].cast("Q")
+        self.prefix_count = MappedArray(words[:prefix_slots])
+        offset = prefix_slots
+        self.kmers = MappedArray(words[offset:offset + n])
+        offset += n
+        self.frequency = MappedArray(words[offset:offset + n])
+        offset += n
+        self.cumulative = MappedCumulative(words[offset:offset + n])
+        self._words = words
+
+    def close(self) -> None:
+        """Unmap the file. The arrays must not be used afterwards."""
+        for name in ("prefix_count", "kmers", "frequency", "cumulative"):
+            part = getattr(self, name, None)
+            if part is not None:
+                part._view.release()
+        if getattr(self, "_words", None) is not None:
+            self._words.release()
+            self._view.release()
+        self._map.close()
+        self._file.close()
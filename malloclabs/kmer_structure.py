@@ -6,86 +6,726 @@ Joel Mackenzie and Vladimir Morozov
 MallocLabs K-mer Querying Structure
 """
 
-from typing import Any
+import glob
+import heapq
+import mmap
+import os
+import queue
+import threading
+from bisect import bisect_left, insort
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing
+from typing import Any, Callable, Iterator
 
 """
 You may wish to import your data structures to help you with some of the
 problems. Or maybe not.
 """
 #from structures.bit_vector import BitVector
+from malloclabs.kmer_snapshot import FLAG_CANONICAL, Snapshot, write_snapshot
 from structures.dynamic_array import DynamicArray
+from structures.fenwick_tree import FenwickTree
 #from structures.linked_list import DoublyLinkedList, Node
 
+# A/C/G/T are given codes in lexicographic order, so comparing two packed
+# k-mers of the same length gives the same answer as comparing the strings.
+_BASE_TO_DIGIT = str.maketrans("ACGT", "0123")
+_DIGIT_TO_BASE = "ACGT"
+_COMPLEMENT = str.maketrans("ACGT", "TGCA")
+
+# Byte value -> 2-bit base code, or -1 for anything that is not a base
+# (newlines, spaces, ...), which ends the current sequence.
+_BYTE_TO_CODE = [-1] * 256
+for _code, _base in enumerate(b"ACGT"):
+    _BYTE_TO_CODE[_base] = _code
+
+READ_CHUNK_SIZE = 1 << 20
+MAX_OVERLAP = 12  # compatible() keeps a table of 4^overlap counts
+INGEST_QUEUE_CHUNKS = 64  # Chunks read ahead by ingest() before readers block
+INGEST_BATCH = 1 << 20  # k-mer codes counted by ingest() per sorted run
+
+
+def _pack_kmer(kmer: str) -> int:
+    """Pack a k-mer into an integer, 2 bits per base (A=0, C=1, G=2, T=3)."""
+    return int(kmer.translate(_BASE_TO_DIGIT), 4)
+
+
+def _unpack_kmer(code: int, k: int) -> str:
+    """Turn a packed k-mer back into its string form."""
+    bases = []
+    for _ in range(k):
+        bases.append(_DIGIT_TO_BASE[code & 3])
+        code >>= 2
+    return "".join(reversed(bases))
+
+
+def _canonical_kmer(kmer: str) -> str:
+    """The smaller of a k-mer and its reverse complement."""
+    return min(kmer, kmer.translate(_COMPLEMENT)[::-1])
+
+
+def _resolve_overlap(k: int, overlap: int | None) -> int:
+    """The prefix length for compatible(): min(2, k) by default, else checked."""
+    if overlap is None:
+        return min(2, k)
+    if not 1 <= overlap <= min(k, MAX_OVERLAP):
+        raise ValueError(f"overlap must be between 1 and min(k, {MAX_OVERLAP}), got {overlap}")
+    return overlap
+
+
+def _read_chunks(infile: str, chunk_size: int, use_mmap: bool) -> Iterator[bytes]:
+    """Yield the raw contents of a file in chunks of up to chunk_size bytes."""
+    with open(infile, "rb") as file:
+        if not use_mmap:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        # mmap refuses to map an empty file
+        if file.seek(0, 2) == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(0, len(mapped), chunk_size):
+                yield mapped[offset:offset + chunk_size]
+
+
+def _split_ranges(infile: str, pieces: int) -> list[tuple[int, int]]:
+    """
+    Cut a file into about `pieces` byte ranges that each start at the
+    beginning of a line, so no k-mer straddles two ranges.
+    """
+    size = os.path.getsize(infile)
+    bounds = [0]
+    with open(infile, "rb") as file:
+        for piece in range(1, pieces):
+            target = max(size * piece // pieces, bounds[-1])
+            file.seek(target)
+            if target > 0:
+                file.readline()  # Move to the start of the next line
+            offset = file.tell()
+            if offset >= size:
+                break
+            if offset > bounds[-1]:
+                bounds.append(offset)
+    bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+
+def _expand_sources(sources: str | list[str]) -> list[str]:
+    """
+    Turn a file, directory or glob pattern (or a list of them) into the
+    list of files to read. Directories contribute the regular files
+    directly inside them; directories and patterns are expanded in
+    sorted order.
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            files.extend(path for path in sorted(glob.glob(os.path.join(glob.escape(source), "*")))
+                         if os.path.isfile(path))
+        elif glob.has_magic(source):
+            files.extend(path for path in sorted(glob.glob(source)) if os.path.isfile(path))
+        else:
+            files.append(source)
+    return files
+
+
+def _ingest_reader(index: int, infile: str, chunks: queue.Queue, stop: threading.Event,
+                   chunk_size: int, use_mmap: bool) -> None:
+    """
+    Reader thread for KmerStore.ingest: put (index, chunk) items on the
+    queue, then (index, None) when the file is done or (index, error) if
+    reading raised. put() blocks while the queue is full, which is what
+    keeps the readers from running ahead of the counting stage.
+    """
+    def put(item: tuple[int, Any]) -> bool:
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    try:
+        for chunk in _read_chunks(infile, chunk_size, use_mmap):
+            if not put((index, chunk)):
+                return
+    except Exception as error:
+        # Anything else would end the thread silently and leave ingest waiting
+        put((index, error))
+        return
+    put((index, None))
+
+
+def _ingest_chunks(sources: str | list[str], readers: int, chunk_size: int, use_mmap: bool,
+                   queue_chunks: int,
+                   progress: Callable[[int, int, int], None] | None) -> Iterator[tuple[int, bytes]]:
+    """
+    The reading stage of ingest(), shared by the engines: expand the
+    sources, read the files on a pool of `readers` threads into a queue
+    of at most queue_chunks chunks, and yield (file index, chunk) pairs
+    in arrival order. Chunks of one file arrive in order, so the caller
+    only keeps per-file scanning state. progress(files_done,
+    files_total, bytes_done) is called once the caller has handled each
+    chunk and after every finished file. A reader's exception is
+    re-raised here. Close the generator (e.g. with contextlib.closing)
+    if the caller can stop early, so the readers are released.
+    """
+    files = _expand_sources(sources)
+    if not files:
+        return
+    chunks = queue.Queue(maxsize=max(1, queue_chunks))
+    stop = threading.Event()
+    files_done = bytes_done = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, readers)) as pool:
+        for index, infile in enumerate(files):
+            pool.submit(_ingest_reader, index, infile, chunks, stop, chunk_size, use_mmap)
+        try:
+            while files_done < len(files):
+                index, chunk = chunks.get()
+                if chunk is None:
+                    files_done += 1
+                elif isinstance(chunk, Exception):
+                    raise chunk
+                else:
+                    bytes_done += len(chunk)
+                    yield index, chunk
+                if progress is not None:
+                    progress(files_done, len(files), bytes_done)
+        finally:
+            # Unblocks readers waiting on a full queue if counting stopped early
+            stop.set()
+
+
+def _count_runs(keys: list[Any]) -> tuple[list[Any], list[int]]:
+    """
+    Collapse a sorted list of keys into parallel lists of the
+    distinct keys and how many times each one occurs.
+    Time complexity: O(N)
+    """
+    unique_keys = []
+    counts = []
+    i, n = 0, len(keys)
+    while i < n:
+        key = keys[i]
+        j = i + 1
+        while j < n and keys[j] == key:
+            j += 1
+        unique_keys.append(key)
+        counts.append(j - i)
+        i = j
+    return unique_keys, counts
+
+
+def _merge_runs(runs: list[tuple[list[int], list[int]]]) -> tuple[list[int], list[int]]:
+    """
+    Merge several sorted (codes, counts) runs into one, adding up the
+    counts of codes that appear in more than one run.
+    """
+    codes = []
+    counts = []
+    for code, count in heapq.merge(*(zip(*run) for run in runs)):
+        if codes and codes[-1] == code:
+            counts[-1] += count
+        else:
+            codes.append(code)
+            counts.append(count)
+    return codes, counts
+
+
+def _count_shards(infile: str, start: int, end: int, k: int, chunk_size: int,
+                  canonical: bool) -> list[tuple[list[int], list[int]]]:
+    """
+    Worker for KmerStore.read_parallel: count the k-mers in
+    infile[start:end] and return one sorted (codes, counts) run for each
+    of the 16 two-base prefixes (the 4 one-base prefixes when k is 1).
+    """
+    scanner = _RollingScanner(k, canonical)
+    codes = []
+    with open(infile, "rb") as file:
+        file.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = file.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            codes.extend(scanner.feed(chunk))
+    codes.sort()
+    unique_codes, counts = _count_runs(codes)
+
+    # The codes are sorted, so each prefix shard is a contiguous slice
+    shards = []
+    prefix_bases = min(k, 2)
+    prefix_shift = 2 * (k - prefix_bases)
+    lo = 0
+    for prefix in range(4 ** prefix_bases):
+        hi = bisect_left(unique_codes, (prefix + 1) << prefix_shift, lo)
+        shards.append((unique_codes[lo:hi], counts[lo:hi]))
+        lo = hi
+    return shards
+
+
+class _RollingScanner:
+    """
+    Turns a stream of byte chunks into packed k-mer codes.
+    The current window is kept as a rolling 2-bit encoding, so each new
+    base costs O(1) and no k-mer string is ever sliced out. The window
+    survives between calls to feed(), which means k-mers spanning two
+    chunks are found just like any other.
+    With canonical=True the reverse complement of the window is rolled
+    along too, and the smaller of the two codes is emitted.
+    """
+    def __init__(self, k: int, canonical: bool = False) -> None:
+        self.k = k
+        self.canonical = canonical
+        self._mask = (1 << (2 * k)) - 1
+        self._top_shift = 2 * (k - 1)  # Where a new base enters the reverse complement
+        self._code = 0  # Packed encoding of the last (up to) k bases
+        self._revcomp = 0  # Packed reverse complement of the same window
+        self._filled = 0  # Number of valid bases seen since the last separator
+
+    def feed(self, chunk: bytes) -> list[int]:
+        """Consume a chunk and return the codes of every k-mer completed in it."""
+        if self.canonical:
+            return self._feed_canonical(chunk)
+        codes = []
+        code, filled = self._code, self._filled
+        k, mask, table = self.k, self._mask, _BYTE_TO_CODE
+        for byte in chunk:
+            bits = table[byte]
+            if bits < 0:
+                filled = 0
+                continue
+            code = ((code << 2) | bits) & mask
+            filled += 1
+            if filled >= k:
+                codes.append(code)
+        self._code, self._filled = code, filled
+        return codes
+
+    def _feed_canonical(self, chunk: bytes) -> list[int]:
+        codes = []
+        code, revcomp, filled = self._code, self._revcomp, self._filled
+        k, mask, top_shift, table = self.k, self._mask, self._top_shift, _BYTE_TO_CODE
+        for byte in chunk:
+            bits = table[byte]
+            if bits < 0:
+                filled = 0
+                continue
+            code = ((code << 2) | bits) & mask
+            # The complement of base b is 3 - b, and it enters at the front
+            revcomp = (revcomp >> 2) | ((3 - bits) << top_shift)
+            filled += 1
+            if filled >= k:
+                codes.append(code if code < revcomp else revcomp)
+        self._code, self._revcomp, self._filled = code, revcomp, filled
+        return codes
+
+
+class _FrequencyIndex:
+    """
+    Keys bucketed by their current count, plus the sorted list of counts
+    whose bucket is non-empty. A threshold query only visits the buckets
+    at or above the threshold, so it costs O(log d + r log r) for d
+    distinct counts and r matching keys.
+    """
+    def __init__(self) -> None:
+        self._buckets = {}  # count -> set of keys with exactly that count
+        self._counts = []  # Sorted counts that currently have a bucket
+
+    def move(self, key: Any, old: int, new: int) -> None:
+        """Record that key's count changed from old to new (0 = absent)."""
+        if old > 0:
+            bucket = self._buckets[old]
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[old]
+                self._counts.pop(bisect_left(self._counts, old))
+        if new > 0:
+            bucket = self._buckets.get(new)
+            if bucket is None:
+                bucket = self._buckets[new] = set()
+                insort(self._counts, new)
+            bucket.add(key)
+
+    def at_least(self, m: int) -> list[Any]:
+        """Return the keys with count >= m in sorted order."""
+        result = []
+        for count in self._counts[bisect_left(self._counts, m):]:
+            result.extend(self._buckets[count])
+        result.sort()
+        return result
+
+
 class KmerStore:
     """
     A data structure for maintaining and querying k-mers.
     You may add any additional functions or member variables
     as you see fit.
     At any moment, the structure is maintaining n distinct k-mers.
+
+    With packed=True every k-mer is kept as an integer holding 2 bits
+    per base instead of a str, which is much smaller and makes the
+    comparisons in the binary search integer compares. k-mers are only
+    decoded back into strings when they are returned to the caller.
+    For k <= 32 the codes sit unboxed in a typed 64-bit DynamicArray,
+    like the counts always do, at 8 bytes per k-mer.
+
+    With freq_index=True the store also keeps its keys bucketed by
+    count, so freq_geq only touches the k-mers it returns instead of
+    scanning all n entries.
+
+    compatible() matches the last `overlap` bases of a query against the
+    first `overlap` bases of the stored k-mers (min(2, k) by default, at
+    most MAX_OVERLAP) using a table of 4^overlap counts kept up to date
+    on every insert and delete, so it stays O(1) for any overlap length.
+
+    With canonical=True a k-mer and its reverse complement are counted
+    as one, stored under whichever of the two is smaller. count() answers
+    for either strand; count_geq, freq_geq and compatible see only the
+    stored (canonical) k-mers.
+
+    save() writes the store to a snapshot file and KmerStore.open()
+    maps one back in read-only, answering queries straight off the page
+    cache without rebuilding anything.
+
+    ingest() loads many files (or a directory or glob) at once, reading
+    them on a thread pool while the k-mers already read are counted.
+
+    engine="numpy" returns a NumpyKmerStore instead, which has the same
+    public API but keeps everything in NumPy arrays.
     """
-    def __init__(self, k: int) -> None:
+    def __new__(cls, k: int | None = None, *args: Any, engine: str = "python",
+                **kwargs: Any) -> Any:
+        # k is optional so that pickle and copy can call KmerStore.__new__(cls)
+        if engine == "numpy":
+            from malloclabs.numpy_kmer_store import NumpyKmerStore
+            return NumpyKmerStore(k, *args, **kwargs)
+        if engine != "python":
+            raise ValueError(f"unknown KmerStore engine {engine!r}")
+        return super().__new__(cls)
+
+    def __getnewargs__(self) -> tuple[int]:
+        return (self.k,)
+
+    def __init__(self, k: int, packed: bool = False, freq_index: bool = False,
+                 canonical: bool = False, overlap: int | None = None, engine: str = "python") -> None:
+        overlap = _resolve_overlap(k, overlap)
         self.k = k
-        self.kmers = DynamicArray()  # Using DynamicArray to store k-mers
-        self.frequency = DynamicArray()  # Parallel array to store frequencies
-        self.prefix_count = DynamicArray()
+        self.packed = packed
+        self.canonical = canonical
+        self.overlap = overlap
+        self.freq_index = _FrequencyIndex() if freq_index else None
+        self.kmers = self._key_array()  # Using DynamicArray to store k-mers
+        self.frequency = DynamicArray("q")  # Parallel array to store frequencies
+        self.prefix_count = DynamicArray("q")
+        self.cumulative = FenwickTree()  # Running sums over frequency for count_geq
+        self._snapshot = None  # Set when the store is a mapped, read-only snapshot
+
+        # Initialize the prefix_count array with 4^overlap elements, all set to 0
+        self.prefix_count.fill(4 ** overlap, 0)
+
+    def copy(self) -> "KmerStore":
+        """
+        Return an independent, writable copy of the store.
+        Time complexity: O(n)
+        """
+        other = KmerStore(self.k, packed=self.packed, freq_index=self.freq_index is not None,
+                          canonical=self.canonical, overlap=self.overlap)
+        n = self.kmers.get_size()
+        other.kmers.extend(self.kmers.get_at(i) for i in range(n))
+        other.frequency.extend(self.frequency.get_at(i) for i in range(n))
+        if other.freq_index is not None:
+            for i in range(n):
+                other.freq_index.move(other.kmers.get_at(i), 0, other.frequency.get_at(i))
+        other.prefix_count = DynamicArray.from_iterable(self.prefix_count, "q")
+        other.cumulative.build(other.frequency)
+        return other
+
+    def save(self, path: str) -> None:
+        """
+        Write the store to a snapshot file that KmerStore.open can map.
+        Keys are always written packed, so k must be at most 32.
+        """
+        n = self.kmers.get_size()
+        keys = (self.kmers.get_at(i) for i in range(n))
+        if not self.packed:
+            keys = map(self._encode_kmer, keys)
+        write_snapshot(path, self.k, FLAG_CANONICAL if self.canonical else 0,
+                       self.prefix_count.to_list(), keys,
+                       [self.frequency.get_at(i) for i in range(n)])
 
-        # Initialize the prefix_count array with 16 elements, all set to 0
-        for _ in range(16):
-            self.prefix_count.append(0)
+    @staticmethod
+    def open(path: str) -> "KmerStore":
+        """
+        Map a snapshot written by save() and return a read-only store
+        over it. Queries read the sorted keys, counts and cumulative
+        counts in place; count_geq uses the stored cumulative counts.
+        The store always works on packed keys, whichever mode saved it.
+        """
+        snapshot = Snapshot(path)
+        # Built with the smallest table, which is then swapped for the
+        # mapped one; the table holds 4^overlap counts
+        store = KmerStore(snapshot.k, packed=True, overlap=1,
+                          canonical=bool(snapshot.flags & FLAG_CANONICAL))
+        store.overlap = (snapshot.prefix_count.get_size().bit_length() - 1) // 2
+        store.kmers = snapshot.kmers
+        store.frequency = snapshot.frequency
+        store.cumulative = snapshot.cumulative
+        store.prefix_count = snapshot.prefix_count
+        store._snapshot = snapshot
+        return store
+
+    def close(self) -> None:
+        """Release the mapping of a store returned by KmerStore.open."""
+        if self._snapshot is not None:
+            self._snapshot.close()
+
+    def _check_writable(self) -> None:
+        if self._snapshot is not None:
+            raise RuntimeError("a KmerStore opened from a snapshot is read-only")
+
+    def _key_array(self) -> DynamicArray:
+        """An empty array for keys: unboxed 64-bit codes when packed and k <= 32."""
+        return DynamicArray("Q" if self.packed and self.k <= 32 else None)
+
+    def _encode_kmer(self, kmer: str) -> int:
+        """Pack a k-mer into an integer, 2 bits per base (A=0, C=1, G=2, T=3)."""
+        return _pack_kmer(kmer)
+
+    def _decode_kmer(self, code: int) -> str:
+        """Turn a packed k-mer back into its string form."""
+        return _unpack_kmer(code, self.k)
+
+    def _to_key(self, kmer: str, canonical: bool = True) -> Any:
+        """
+        Convert a k-mer into the key type stored in self.kmers.
+        In canonical mode the k-mer is replaced by the smaller of itself
+        and its reverse complement, unless canonical=False is passed.
+        """
+        if canonical and self.canonical:
+            kmer = _canonical_kmer(kmer)
+        return self._encode_kmer(kmer) if self.packed else kmer
+
+    def _from_key(self, key: Any) -> str:
+        """Convert a stored key back into a k-mer string."""
+        return self._decode_kmer(key) if self.packed else key
+
+    def _prefix_index(self, key: Any) -> int:
+        """Index into prefix_count for the first `overlap` bases of a stored key."""
+        if self.packed:
+            return key >> (2 * (self.k - self.overlap))
+        return self._encode_prefix(key[:self.overlap])
 
     def _encode_prefix(self, prefix: str) -> int:
-        """Encode the two-character prefix into an integer index."""
-        def char_to_index(char: str) -> int:
-            if char == 'A':
-                return 0
-            elif char == 'C':
-                return 1
-            elif char == 'G':
-                return 2
-            elif char == 'T':
-                return 3
-        return char_to_index(prefix[0]) * 4 + char_to_index(prefix[1])
-
-    def read(self, infile: str) -> None:
+        """Encode a prefix into an integer index, 2 bits per base."""
+        return int(prefix.translate(_BASE_TO_DIGIT), 4)
+
+    def read(self, infile: str, chunk_size: int = READ_CHUNK_SIZE,
+             use_mmap: bool = False, bulk: bool = True) -> None:
         """
         Given a path to an input file, break the sequences into
         k-mers and load them into your data structure.
+        The file is streamed in binary chunks of chunk_size bytes (or
+        memory-mapped with use_mmap=True) and k-mers are produced by a
+        rolling encoding rather than by slicing each line.
+        With bulk=True (the default) all k-mers are collected first and
+        the store is built with a single sort, instead of inserting them
+        one at a time. That is O(N log N) for N k-mers in the file rather
+        than O(N * n) element shifts.
         """
-        with open(infile, "r") as file:
-            for line in file:
-                line = line.strip()  # Remove any trailing newline or spaces
-                for i in range(len(line) - self.k + 1):
-                    kmer = line[i:i + self.k]
-                    self._insert_kmer(kmer)
+        self._check_writable()
+        scanner = _RollingScanner(self.k, self.canonical)
+        if not bulk:
+            for chunk in _read_chunks(infile, chunk_size, use_mmap):
+                for code in scanner.feed(chunk):
+                    self._insert_key(code if self.packed else self._decode_kmer(code))
+            return
+
+        codes = []
+        for chunk in _read_chunks(infile, chunk_size, use_mmap):
+            codes.extend(scanner.feed(chunk))
+        codes.sort()
+        unique_codes, counts = _count_runs(codes)
+        if not self.packed:
+            unique_codes = [self._decode_kmer(code) for code in unique_codes]
+        self._merge_counted(unique_codes, counts)
+
+    def read_parallel(self, infiles: str | list[str], workers: int | None = None,
+                      chunk_size: int = READ_CHUNK_SIZE) -> None:
+        """
+        Same as read, but the input file(s) are cut into line-aligned
+        byte ranges and counted by a pool of worker processes.
+        Each worker returns sorted (k-mer, count) runs per two-base
+        prefix shard; the runs of every shard are merged, and since the
+        shards are in prefix order they are simply concatenated and
+        merged into the store once.
+        """
+        self._check_writable()
+        if isinstance(infiles, str):
+            infiles = [infiles]
+        workers = workers or os.cpu_count() or 1
+
+        # A few ranges per worker keeps the pool busy when ranges are uneven
+        sizes = [os.path.getsize(infile) for infile in infiles]
+        total = sum(sizes) or 1
+        tasks = []
+        for infile, size in zip(infiles, sizes):
+            pieces = max(1, round(4 * workers * size / total))
+            for start, end in _split_ranges(infile, pieces):
+                tasks.append((infile, start, end))
+
+        shard_runs = [[] for _ in range(4 ** min(self.k, 2))]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_count_shards, infile, start, end, self.k, chunk_size,
+                                   self.canonical)
+                       for infile, start, end in tasks]
+            for future in futures:
+                for prefix, run in enumerate(future.result()):
+                    if run[0]:
+                        shard_runs[prefix].append(run)
+
+        keys = []
+        counts = []
+        for runs in shard_runs:
+            shard_codes, shard_counts = _merge_runs(runs)
+            keys.extend(shard_codes if self.packed else map(self._decode_kmer, shard_codes))
+            counts.extend(shard_counts)
+        self._merge_counted(keys, counts)
+
+    def ingest(self, sources: str | list[str], readers: int = 4,
+               chunk_size: int = READ_CHUNK_SIZE, use_mmap: bool = False,
+               queue_chunks: int = INGEST_QUEUE_CHUNKS, batch_size: int = INGEST_BATCH,
+               progress: Callable[[int, int, int], None] | None = None) -> None:
+        """
+        Load many input files at once, overlapping I/O with counting.
+        sources is a path, a directory, a glob pattern or a list of them.
+
+        A pool of `readers` threads reads the files in chunks into a
+        queue that holds at most queue_chunks chunks, so at most about
+        queue_chunks * chunk_size bytes are buffered; readers block
+        until the counting stage catches up. The counting stage keeps a
+        rolling scanner per file, so chunks of different files can be
+        interleaved freely, and counts every batch_size codes into a
+        sorted run. The runs are merged into the store once at the end.
+
+        progress(files_done, files_total, bytes_done) is called after
+        every chunk and every finished file.
+        """
+        self._check_writable()
+        scanners = {}  # File index -> rolling scanner of that file
+        runs = []
+        codes = []
+        with closing(_ingest_chunks(sources, readers, chunk_size, use_mmap, queue_chunks,
+                                    progress)) as chunks:
+            for index, chunk in chunks:
+                scanner = scanners.get(index)
+                if scanner is None:
+                    scanner = scanners[index] = _RollingScanner(self.k, self.canonical)
+                codes.extend(scanner.feed(chunk))
+                if len(codes) >= batch_size:
+                    codes.sort()
+                    runs.append(_count_runs(codes))
+                    codes = []
+        if not scanners:
+            return
+
+        codes.sort()
+        runs.append(_count_runs(codes))
+        keys, counts = _merge_runs(runs) if len(runs) > 1 else runs[0]
+        if not self.packed:
+            keys = [self._decode_kmer(code) for code in keys]
+        self._merge_counted(keys, counts)
+
+    def _merge_counted(self, keys: list[Any], counts: list[int]) -> None:
+        """
+        Merge sorted distinct keys and their counts into the store.
+        The existing arrays and the new keys are walked once, side by
+        side, into fresh arrays, and prefix_count is updated on the way.
+        Time complexity: O(n + m)
+        """
+        kmers = self._key_array()
+        frequency = DynamicArray("q")
+        n, m = self.kmers.get_size(), len(keys)
+        kmers.reserve(n + m)
+        frequency.reserve(n + m)
+        i = j = 0
+        while i < n or j < m:
+            if j == m or (i < n and self.kmers.get_at(i) < keys[j]):
+                # Only in the store
+                kmers.append(self.kmers.get_at(i))
+                frequency.append(self.frequency.get_at(i))
+                i += 1
+                continue
+
+            key, added = keys[j], counts[j]
+            old = 0
+            if i < n and self.kmers.get_at(i) == key:
+                # In both: add the new occurrences to the stored count
+                old = self.frequency.get_at(i)
+                i += 1
+            kmers.append(key)
+            frequency.append(old + added)
+            j += 1
+
+            if self.freq_index is not None:
+                self.freq_index.move(key, old, old + added)
+
+            prefix_index = self._prefix_index(key)
+            self.prefix_count.set_at(prefix_index, self.prefix_count.get_at(prefix_index) + added)
+
+        self.kmers = kmers
+        self.frequency = frequency
+        self.cumulative.build(frequency)
 
     def _insert_kmer(self, kmer: str) -> None:
         """
         Helper function to insert a k-mer into the DynamicArray
         and update its frequency.
         """
-        """ Insert kmer into the sorted DynamicArray and maintain frequency. """
-        index = self._binary_search_insert_position(kmer)
-        if index < self.kmers.get_size() and self.kmers.get_at(index) == kmer:
-            self.frequency.set_at(index, self.frequency.get_at(index) + 1)
+        self._insert_key(self._to_key(kmer))
+
+    def _insert_key(self, key: Any) -> None:
+        """ Insert key into the sorted DynamicArray and maintain frequency. """
+        index = self._binary_search_insert_position(key)
+        if index < self.kmers.get_size() and self.kmers.get_at(index) == key:
+            old = self.frequency.get_at(index)
+            self.frequency.set_at(index, old + 1)
+            self.cumulative.add(index, 1)
         else:
-            self._insert_at_position(index, kmer)
+            # The shift is only O(min(index, n - index)), but every later
+            # Fenwick slot changes, so the O(n) rebuild dominates a new key
+            old = 0
+            self._insert_at_position(index, key)
+            self.cumulative.build(self.frequency)
+        if self.freq_index is not None:
+            self.freq_index.move(key, old, old + 1)
 
-        # Track the first two characters (prefix)
-        prefix = kmer[:2]
-        prefix_index = self._encode_prefix(prefix)
+        # Track the first `overlap` characters (prefix)
+        prefix_index = self._prefix_index(key)
         self.prefix_count.set_at(prefix_index, self.prefix_count.get_at(prefix_index) + 1)
 
     def batch_insert(self, kmers: list[str]) -> None:
         """
-        Given a list of m k-mers, delete the matching ones
+        Given a list of m k-mers, insert them into the store
         (including all duplicates).
         [V2: Correction]
         If the data structure contains n elements, and the input kmer list
         contains m elements, the targeted time complexity is:
         O(m log m) + O(n + m) amortized time (or better, of course!)
+        The batch is sorted and counted, then merged with the store in
+        one linear pass.
         """
-        for kmer in kmers:
-            self._insert_kmer(kmer)
+        self._check_writable()
+        keys = [self._to_key(kmer) for kmer in kmers]
+        keys.sort()
+        self._merge_counted(*_count_runs(keys))
 
     def batch_delete(self, kmers: list[str]) -> None:
         """
@@ -95,53 +735,79 @@ class KmerStore:
         If the data structure contains n elements, and the input kmer list
         contains m elements, the targeted time complexity is:
         O(m log m) + O(n + m) amortized time (or better, of course!)
- 
+        The victims are sorted, then walked side by side
+        with the store; surviving entries are compacted towards the front
+        of kmers/frequency in place, and prefix_count loses the full
+        multiplicity of every removed k-mer.
         """
-        new_kmers = DynamicArray()
-        for i in range(self.kmers.get_size()):
-            kmer = self.kmers.get_at(i)
-            if kmer in kmers:
-                self.frequency[kmer] -= 1
-                if self.frequency[kmer] == 0:
-                    self.frequency[kmer] = None 
-            else:
-                new_kmers.append(kmer)
-        self.kmers = new_kmers
+        self._check_writable()
+        victims = [self._to_key(kmer) for kmer in kmers]
+        victims.sort()
+
+        n, m = self.kmers.get_size(), len(victims)
+        write = 0
+        j = 0
+        for i in range(n):
+            key = self.kmers.get_at(i)
+            while j < m and victims[j] < key:
+                j += 1
+            if j < m and victims[j] == key:
+                removed = self.frequency.get_at(i)
+                prefix_index = self._prefix_index(key)
+                self.prefix_count.set_at(prefix_index, self.prefix_count.get_at(prefix_index) - removed)
+                if self.freq_index is not None:
+                    self.freq_index.move(key, removed, 0)
+                continue
+            if write != i:
+                self.kmers.set_at(write, key)
+                self.frequency.set_at(write, self.frequency.get_at(i))
+            write += 1
+
+        # Drop the now unused tail
+        for _ in range(n - write):
+            self.kmers.remove_at(self.kmers.get_size() - 1)
+            self.frequency.remove_at(self.frequency.get_size() - 1)
+        self.cumulative.build(self.frequency)
 
     def freq_geq(self, m: int) -> list[str]:
         """
         Given an integer m, return a list of k-mers that occur
         >= m times in your data structure.
         Time complexity for full marks: O(n)
+        With the frequency index enabled only the buckets with a count
+        of at least m are visited: O(log n + r log r) for r results.
         """
+        if self.freq_index is not None:
+            return [self._from_key(key) for key in self.freq_index.at_least(m)]
+
         result = []
         for i in range(self.kmers.get_size()):
             freq = self.frequency.get_at(i)
             if freq is not None and freq >= m:
-                result.append(self.kmers.get_at(i))
+                result.append(self._from_key(self.kmers.get_at(i)))
         return result
 
-    def _insert_at_position(self, index: int, kmer: str) -> None:
+    def _insert_at_position(self, index: int, key: Any) -> None:
         """
-        Insert the k-mer at the given index and shift elements accordingly.
+        Insert the k-mer key at the given index and shift elements accordingly.
+        insert_at only shifts the shorter side, so the arrays are updated
+        in O(min(index, n - index)); the caller still has to rebuild
+        cumulative, which costs O(n).
         """
-        self.kmers.append(None)
-        self.frequency.append(0)
-
-        for i in range(self.kmers.get_size() - 1, index, -1):
-            self.kmers.set_at(i, self.kmers.get_at(i - 1))
-            self.frequency.set_at(i, self.frequency.get_at(i - 1))
+        self.kmers.insert_at(index, key)
+        self.frequency.insert_at(index, 1)
 
-        self.kmers.set_at(index, kmer)
-        self.frequency.set_at(index, 1)
-
-    def _binary_search_insert_position(self, kmer: str) -> int:
-        """Find the correct position to insert kmer to keep the array sorted."""
-        low, high = 0, self.kmers.get_size() - 1
+    def _binary_search_insert_position(self, key: Any, low: int = 0, high: int | None = None) -> int:
+        """
+        Find the correct position to insert key to keep the array sorted.
+        The search can be narrowed to positions low..high inclusive.
+        """
+        if high is None:
+            high = self.kmers.get_size() - 1
         while low <= high:
             mid = (low + high) // 2
-            mid_kmer = self.kmers.get_at(mid)
-            if mid_kmer < kmer:
+            mid_key = self.kmers.get_at(mid)
+            if mid_key < key:
                 low = mid + 1
             else:
                 high = mid - 1
@@ -153,8 +819,9 @@ class KmerStore:
         your data structure.
         Time complexity for full marks: O(log n)
         """
-        index = self._binary_search_insert_position(kmer)
-        if index < self.kmers.get_size() and self.kmers.get_at(index) == kmer:
+        key = self._to_key(kmer)
+        index = self._binary_search_insert_position(key)
+        if index < self.kmers.get_size() and self.kmers.get_at(index) == key:
             return self.frequency.get_at(index)
         return 0
 
@@ -163,27 +830,79 @@ class KmerStore:
         Given a k-mer, return the total number of k-mers that
         are lexicographically greater or equal.
         Time complexity for full marks: O(log n)
+        Everything before the insert position is summed by the Fenwick
+        tree and subtracted from the total.
         """
-        index = self._binary_search_insert_position(kmer)
-        count = 0
-        for i in range(index, self.kmers.get_size()):
-            count += self.frequency.get_at(i)
-        return count
+        index = self._binary_search_insert_position(self._to_key(kmer, canonical=False))
+        return self.cumulative.total() - self.cumulative.prefix_sum(index)
+
+    def _search_many(self, keys: list[Any]) -> list[int]:
+        """
+        Insert positions for many keys at once. The keys are visited in
+        sorted order and each search gallops forward from where the
+        previous one ended, so the whole batch costs O(m log m) for the
+        sort plus O(m log(n / m)) for the searches, and never more than
+        a single merge-style sweep over the store.
+        """
+        n = self.kmers.get_size()
+        positions = [0] * len(keys)
+        low = 0
+        for i in sorted(range(len(keys)), key=keys.__getitem__):
+            key = keys[i]
+            # Double the step until it overshoots key, then binary search the gap
+            step = 1
+            high = low
+            while high < n and self.kmers.get_at(high) < key:
+                low = high + 1
+                high = low + step - 1
+                step *= 2
+            low = self._binary_search_insert_position(key, low, min(high, n) - 1)
+            positions[i] = low
+        return positions
+
+    def count_many(self, kmers: list[str]) -> list[int]:
+        """
+        Batched count: return count(kmer) for every k-mer in the list,
+        in the same order as the input.
+        """
+        keys = [self._to_key(kmer) for kmer in kmers]
+        n = self.kmers.get_size()
+        result = []
+        for key, index in zip(keys, self._search_many(keys)):
+            if index < n and self.kmers.get_at(index) == key:
+                result.append(self.frequency.get_at(index))
+            else:
+                result.append(0)
+        return result
+
+    def count_geq_many(self, kmers: list[str]) -> list[int]:
+        """
+        Batched count_geq: return count_geq(kmer) for every k-mer in the
+        list, in the same order as the input.
+        """
+        keys = [self._to_key(kmer, canonical=False) for kmer in kmers]
+        total = self.cumulative.total()
+        return [total - self.cumulative.prefix_sum(index) for index in self._search_many(keys)]
 
     def compatible(self, kmer: str) -> int:
         """
         Given a k-mer, return the total number of compatible
-        k-mers. You will be using the two suffix characters
-        of the input k-mer to compare against the first two
-        characters of all other k-mers.
+        k-mers. You will be using the `overlap` suffix characters
+        of the input k-mer (two by default) to compare against the
+        first `overlap` characters of all other k-mers.
         Time complexity for full marks: O(1) :-)
         """
-        last_two = kmer[-2:]
-        complement_map = ["T", "A", "G", "C"]  # Corresponds to A->T, C->G, G->C, T->A
-        first_two_complement = complement_map[ord(last_two[0]) % 4] + complement_map[ord(last_two[1]) % 4]
+        suffix_complement = kmer[-self.overlap:].translate(_COMPLEMENT)  # A->T, C->G, G->C, T->A
 
         # Calculate the index for the complementary prefix
-        complement_index = self._encode_prefix(first_two_complement)
-        
+        complement_index = self._encode_prefix(suffix_complement)
+
         # Return the count directly from the DynamicArray
         return self.prefix_count.get_at(complement_index)
+
+    def compatible_many(self, kmers: list[str]) -> list[int]:
+        """
+        Batched compatible: return compatible(kmer) for every k-mer in
+        the list, in the same order as the input. O(1) per k-mer.
+        """
+        return [self.compatible(kmer) for kmer in kmers]
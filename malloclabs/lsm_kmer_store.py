@@ -0,0 +1,246 @@
+"""
+MallocLabs K-mer Querying Structure: log-structured (LSM) variant
+"""
+
+import heapq
+import threading
+from typing import Iterator
+
+from malloclabs.kmer_structure import (_COMPLEMENT, READ_CHUNK_SIZE, _canonical_kmer, _pack_kmer,
+                                      _read_chunks, _resolve_overlap, _RollingScanner,
+                                      _unpack_kmer)
+from structures.dynamic_array import DynamicArray
+
+
+class _Run:
+    """
+    An immutable sorted run of (packed k-mer, delta) pairs, with the
+    running total of the deltas so range sums cost O(log n).
+    Deltas are negative where a delete cancelled older occurrences.
+    """
+    def __init__(self, items: Iterator[tuple[int, int]]) -> None:
+        self.keys = DynamicArray()  # Codes outgrow 64 bits for k > 32
+        self.deltas = DynamicArray("q")
+        self.cumulative = DynamicArray("q")  # cumulative[i] = deltas[0] + ... + deltas[i]
+        total = 0
+        for key, delta in items:
+            if delta == 0:
+                continue  # Nothing to remember: all sums are additive
+            total += delta
+            self.keys.append(key)
+            self.deltas.append(delta)
+            self.cumulative.append(total)
+
+    def get_size(self) -> int:
+        return self.keys.get_size()
+
+    def _lower_bound(self, key: int) -> int:
+        low, high = 0, self.keys.get_size() - 1
+        while low <= high:
+            mid = (low + high) // 2
+            if self.keys.get_at(mid) < key:
+                low = mid + 1
+            else:
+                high = mid - 1
+        return low
+
+    def get(self, key: int) -> int:
+        """Delta stored for key, or 0. Time complexity: O(log n)"""
+        index = self._lower_bound(key)
+        if index < self.keys.get_size() and self.keys.get_at(index) == key:
+            return self.deltas.get_at(index)
+        return 0
+
+    def sum_geq(self, key: int) -> int:
+        """Sum of the deltas of keys >= key. Time complexity: O(log n)"""
+        size = self.keys.get_size()
+        if size == 0:
+            return 0
+        index = self._lower_bound(key)
+        before = self.cumulative.get_at(index - 1) if index > 0 else 0
+        return self.cumulative.get_at(size - 1) - before
+
+    def items(self) -> Iterator[tuple[int, int]]:
+        for i in range(self.keys.get_size()):
+            yield self.keys.get_at(i), self.deltas.get_at(i)
+
+
+def _merge_items(sources: list[Iterator[tuple[int, int]]]) -> Iterator[tuple[int, int]]:
+    """Merge sorted (key, delta) streams, adding up deltas of equal keys."""
+    current_key, current_delta = None, 0
+    for key, delta in heapq.merge(*sources):
+        if key == current_key:
+            current_delta += delta
+            continue
+        if current_key is not None:
+            yield current_key, current_delta
+        current_key, current_delta = key, delta
+    if current_key is not None:
+        yield current_key, current_delta
+
+
+class LsmKmerStore:
+    """
+    A log-structured k-mer store for sustained write streams.
+
+    Inserts and deletes land in a small in-memory buffer (packed k-mer ->
+    change in count). When the buffer holds buffer_limit k-mers it is
+    sorted into an immutable run. Runs are merged by size-tiered
+    compaction: two adjacent runs are merged whenever the older one is
+    at most `fanout` times the size of the newer, which keeps O(log n)
+    runs and makes each k-mer take part in O(log n) merges, so ingest
+    costs O(log n) amortized per k-mer. With background=True merges run
+    on a worker thread and are published atomically, so writers never
+    wait for them.
+
+    Every entry is a delta, so queries just add up the buffer and all
+    runs: count is O(r log n) for r runs, count_geq is O(r log n + b) for
+    a buffer of b entries, and compatible is O(1) from a prefix table
+    maintained on every write. A delete records minus the current count,
+    and compaction drops any key whose deltas cancel out.
+    """
+
+    def __init__(self, k: int, buffer_limit: int = 4096, fanout: int = 2,
+                 canonical: bool = False, overlap: int | None = None,
+                 background: bool = False) -> None:
+        overlap = _resolve_overlap(k, overlap)
+        self.k = k
+        self.canonical = canonical
+        self.overlap = overlap
+        self.buffer_limit = buffer_limit
+        self.fanout = fanout
+        self.background = background
+        self._buffer = {}
+        self._runs = ()  # Oldest first; replaced as a whole, never mutated
+        self._runs_lock = threading.Lock()
+        self._compactor = None
+        self._prefix_shift = 2 * (k - overlap)
+        self.prefix_count = DynamicArray("q")
+        self.prefix_count.fill(4 ** overlap, 0)
+
+    def _encode(self, kmer: str) -> int:
+        return _pack_kmer(_canonical_kmer(kmer) if self.canonical else kmer)
+
+    def _add(self, code: int, delta: int) -> None:
+        self._buffer[code] = self._buffer.get(code, 0) + delta
+        prefix_index = code >> self._prefix_shift
+        self.prefix_count.set_at(prefix_index, self.prefix_count.get_at(prefix_index) + delta)
+        if len(self._buffer) >= self.buffer_limit:
+            self.flush()
+
+    def _stored(self, code: int) -> int:
+        """Total count of a code over the buffer and every run."""
+        total = self._buffer.get(code, 0)
+        for run in self._runs:
+            total += run.get(code)
+        return total
+
+    def read(self, infile: str, chunk_size: int = READ_CHUNK_SIZE, use_mmap: bool = False) -> None:
+        """
+        Given a path to an input file, break the sequences into
+        k-mers and load them into the store.
+        """
+        scanner = _RollingScanner(self.k, self.canonical)
+        for chunk in _read_chunks(infile, chunk_size, use_mmap):
+            for code in scanner.feed(chunk):
+                self._add(code, 1)
+
+    def batch_insert(self, kmers: list[str]) -> None:
+        """Insert a list of k-mers (including all duplicates)."""
+        for kmer in kmers:
+            self._add(self._encode(kmer), 1)
+
+    def batch_delete(self, kmers: list[str]) -> None:
+        """Delete every occurrence of each of the given k-mers."""
+        for kmer in kmers:
+            code = self._encode(kmer)
+            current = self._stored(code)
+            if current:
+                self._add(code, -current)
+
+    def flush(self) -> None:
+        """Turn the buffer into a new sorted run and compact if needed."""
+        if not self._buffer:
+            return
+        run = _Run(sorted(self._buffer.items()))
+        self._buffer = {}
+        with self._runs_lock:
+            self._runs = self._runs + (run,)
+        if not self.background:
+            self._compact()
+        elif self._compactor is None or not self._compactor.is_alive():
+            self._compactor = threading.Thread(target=self._compact, daemon=True)
+            self._compactor.start()
+
+    def _next_merge(self) -> tuple[_Run, _Run] | None:
+        runs = self._runs
+        for i in range(len(runs) - 2, -1, -1):
+            if runs[i].get_size() <= self.fanout * runs[i + 1].get_size():
+                return runs[i], runs[i + 1]
+        return None
+
+    def _compact(self) -> None:
+        """Merge adjacent runs until the size-tiered invariant holds."""
+        while True:
+            with self._runs_lock:
+                pair = self._next_merge()
+            if pair is None:
+                return
+            older, newer = pair
+            merged = _Run(_merge_items([older.items(), newer.items()]))
+            with self._runs_lock:
+                # Runs only ever get appended meanwhile, so the pair is still adjacent
+                runs = self._runs
+                i = runs.index(older)
+                self._runs = runs[:i] + (merged,) + runs[i + 2:]
+
+    def wait(self) -> None:
+        """Block until background compaction has finished."""
+        if self._compactor is not None:
+            self._compactor.join()
+            # A run flushed just as the worker finished may still need merging
+            self._compact()
+
+    def count(self, kmer: str) -> int:
+        """
+        Given a k-mer, return the number of times it appears.
+        Time complexity: O(r log n)
+        """
+        return self._stored(self._encode(kmer))
+
+    def count_geq(self, kmer: str) -> int:
+        """
+        Return the total number of k-mers that are lexicographically
+        greater or equal.
+        Time complexity: O(r log n + b)
+        """
+        code = _pack_kmer(kmer)
+        total = 0
+        for run in self._runs:
+            total += run.sum_geq(code)
+        for key, delta in self._buffer.items():
+            if key >= code:
+                total += delta
+        return total
+
+    def freq_geq(self, m: int) -> list[str]:
+        """
+        Return the k-mers that occur >= m times, in sorted order.
+        All runs and the buffer are merged on the fly: O(n log r).
+        """
+        sources = [run.items() for run in self._runs]
+        sources.append(iter(sorted(self._buffer.items())))
+        return [_unpack_kmer(key, self.k) for key, total in _merge_items(sources)
+                if total >= m and total > 0]
+
+    def compatible(self, kmer: str) -> int:
+        """
+        Return the number of k-mers whose first `overlap` bases are the
+        complements of the last `overlap` bases of the input.
+        Time complexity: O(1)
+        """
+        suffix_complement = kmer[-self.overlap:].translate(_COMPLEMENT)  # A->T, C->G, G->C, T->A
+        return self.prefix_count.get_at(_pack_kmer(suffix_complement))
+
+    def get_num_runs(self) -> int:
+        return len(self._runs)
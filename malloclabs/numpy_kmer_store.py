@@ -0,0 +1,301 @@
+"""
+MallocLabs K-mer Querying Structure: NumPy engine
+
+Same public API as KmerStore, but the packed k-mers, their counts and
+the cumulative counts live in contiguous NumPy arrays and every
+operation is a handful of vectorized calls. Select it with
+KmerStore(k, engine="numpy").
+"""
+
+import os
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only this engine needs it
+    np = None
+
+from malloclabs.kmer_snapshot import FLAG_CANONICAL, write_snapshot
+from malloclabs.kmer_structure import (INGEST_BATCH, INGEST_QUEUE_CHUNKS, READ_CHUNK_SIZE,
+                                      _count_shards, _ingest_chunks, _resolve_overlap,
+                                      _split_ranges)
+
+if np is not None:
+    # Byte value -> 2-bit base code, or -1 for anything that is not a base
+    _BYTE_TO_CODE = np.full(256, -1, dtype=np.int8)
+    _BYTE_TO_CODE[np.frombuffer(b"ACGT", dtype=np.uint8)] = np.arange(4, dtype=np.int8)
+    _CODE_TO_BYTE = np.frombuffer(b"ACGT", dtype=np.uint8)
+
+
+class NumpyKmerStore:
+    """
+    KmerStore backed by NumPy arrays:
+        kmers       sorted packed k-mers (uint64, so k <= 32)
+        frequency   count of each k-mer (int64)
+        cumulative  running total of frequency, for O(log n) count_geq
+        prefix_count  the 4^overlap prefix table used by compatible
+    Keys are always packed, so packed= and freq_index= are accepted for
+    compatibility with KmerStore but have no effect.
+    """
+    def __init__(self, k: int, packed: bool = True, freq_index: bool = False,
+                 canonical: bool = False, overlap: int | None = None) -> None:
+        if np is None:
+            raise ImportError("the numpy KmerStore engine requires NumPy to be installed")
+        if k > 32:
+            raise ValueError(f"the numpy KmerStore engine supports k <= 32, got {k}")
+        overlap = _resolve_overlap(k, overlap)
+        self.k = k
+        self.packed = True
+        self.canonical = canonical
+        self.overlap = overlap
+        self.kmers = np.zeros(0, dtype=np.uint64)
+        self.frequency = np.zeros(0, dtype=np.int64)
+        self.cumulative = np.zeros(0, dtype=np.int64)
+        self.prefix_count = np.zeros(4 ** overlap, dtype=np.int64)
+        self._prefix_shift = np.uint64(2 * (k - overlap))
+
+    def copy(self) -> "NumpyKmerStore":
+        """Return an independent copy of the store."""
+        other = NumpyKmerStore(self.k, canonical=self.canonical, overlap=self.overlap)
+        other.kmers = self.kmers.copy()
+        other.frequency = self.frequency.copy()
+        other.cumulative = self.cumulative.copy()
+        other.prefix_count = self.prefix_count.copy()
+        return other
+
+    def _window_codes(self, values: "np.ndarray") -> "np.ndarray":
+        """
+        Packed codes of every complete k-mer in an array of base codes
+        (-1 marks a separator). Windows containing a separator are dropped.
+        """
+        k = self.k
+        windows = len(values) - k + 1
+        if windows <= 0:
+            return np.zeros(0, dtype=np.uint64)
+        invalid = np.concatenate(([0], np.cumsum(values < 0)))
+        valid = invalid[k:] - invalid[:windows] == 0
+        bases = np.where(values < 0, 0, values).astype(np.uint64)
+
+        codes = np.zeros(windows, dtype=np.uint64)
+        for j in range(k):
+            codes = (codes << np.uint64(2)) | bases[j:j + windows]
+        if self.canonical:
+            revcomp = np.zeros(windows, dtype=np.uint64)
+            for j in range(k):
+                revcomp |= (np.uint64(3) - bases[j:j + windows]) << np.uint64(2 * j)
+            codes = np.minimum(codes, revcomp)
+        return codes[valid]
+
+    def _chunk_codes(self, carry: "np.ndarray", chunk: bytes) -> tuple["np.ndarray", "np.ndarray"]:
+        """
+        Codes of the k-mers completed by a chunk, given the base codes
+        carried over from the previous chunks of the same stream, and
+        the last (up to) k-1 base codes to carry into the next one.
+        """
+        values = np.concatenate((carry, _BYTE_TO_CODE[np.frombuffer(chunk, dtype=np.uint8)]))
+        # Chunks shorter than k-1 must not lose the bases carried in front of them
+        return self._window_codes(values), values[max(0, len(values) - (self.k - 1)):]
+
+    def _encode_many(self, kmers: list[str], canonical: bool = True) -> "np.ndarray":
+        """Pack a list of k-mer strings into a uint64 array."""
+        if not kmers:
+            return np.zeros(0, dtype=np.uint64)
+        raw = np.frombuffer("".join(kmers).encode("ascii"), dtype=np.uint8)
+        values = _BYTE_TO_CODE[raw].reshape(len(kmers), self.k).astype(np.uint64)
+        shifts = np.arange(2 * (self.k - 1), -1, -2, dtype=np.uint64)
+        codes = np.bitwise_or.reduce(values << shifts, axis=1)
+        if canonical and self.canonical:
+            revcomp = np.bitwise_or.reduce((np.uint64(3) - values) << shifts[::-1], axis=1)
+            codes = np.minimum(codes, revcomp)
+        return codes
+
+    def _decode_many(self, codes: "np.ndarray") -> list[str]:
+        """Turn an array of packed codes back into k-mer strings."""
+        k = self.k
+        shifts = np.arange(2 * (k - 1), -1, -2, dtype=np.uint64)
+        digits = (codes[:, None] >> shifts) & np.uint64(3)
+        text = _CODE_TO_BYTE[digits].tobytes().decode("ascii")
+        return [text[i:i + k] for i in range(0, len(text), k)]
+
+    def _merge(self, keys: "np.ndarray", counts: "np.ndarray") -> None:
+        """Add (possibly unsorted, repeated) keys with counts into the store."""
+        if len(keys) == 0:
+            return
+        np.add.at(self.prefix_count, (keys >> self._prefix_shift).astype(np.intp), counts)
+        all_keys = np.concatenate((self.kmers, keys))
+        all_counts = np.concatenate((self.frequency, counts))
+        order = np.argsort(all_keys, kind="stable")
+        all_keys = all_keys[order]
+        all_counts = all_counts[order]
+        starts = np.flatnonzero(np.concatenate(([True], all_keys[1:] != all_keys[:-1])))
+        self.kmers = all_keys[starts]
+        self.frequency = np.add.reduceat(all_counts, starts)
+        self.cumulative = np.cumsum(self.frequency)
+
+    def read(self, infile: str, chunk_size: int = READ_CHUNK_SIZE, use_mmap: bool = False,
+             bulk: bool = True) -> None:
+        """
+        Given a path to an input file, break the sequences into
+        k-mers and load them into your data structure.
+        The file is read in chunks; the last k-1 bytes of each chunk are
+        carried into the next so windows spanning a boundary are kept.
+        use_mmap and bulk are accepted for compatibility with KmerStore.
+        """
+        parts = []
+        carry = np.zeros(0, dtype=np.int8)
+        with open(infile, "rb") as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                codes, carry = self._chunk_codes(carry, chunk)
+                parts.append(codes)
+        if parts:
+            keys, counts = np.unique(np.concatenate(parts), return_counts=True)
+            self._merge(keys, counts.astype(np.int64))
+
+    def read_parallel(self, infiles: str | list[str], workers: int | None = None,
+                      chunk_size: int = READ_CHUNK_SIZE) -> None:
+        """
+        Same as read, but line-aligned byte ranges of the input file(s)
+        are counted by a pool of worker processes and merged once.
+        """
+        if isinstance(infiles, str):
+            infiles = [infiles]
+        workers = workers or os.cpu_count() or 1
+        tasks = [(infile, start, end) for infile in infiles
+                 for start, end in _split_ranges(infile, 4 * workers)]
+        keys = []
+        counts = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_count_shards, infile, start, end, self.k, chunk_size,
+                                   self.canonical)
+                       for infile, start, end in tasks]
+            for future in futures:
+                for shard_codes, shard_counts in future.result():
+                    keys.append(np.array(shard_codes, dtype=np.uint64))
+                    counts.append(np.array(shard_counts, dtype=np.int64))
+        if keys:
+            self._merge(np.concatenate(keys), np.concatenate(counts))
+
+    def ingest(self, sources: str | list[str], readers: int = 4,
+               chunk_size: int = READ_CHUNK_SIZE, use_mmap: bool = False,
+               queue_chunks: int = INGEST_QUEUE_CHUNKS, batch_size: int = INGEST_BATCH,
+               progress: Callable[[int, int, int], None] | None = None) -> None:
+        """
+        Same as KmerStore.ingest: reader threads fill a bounded queue of
+        chunks from many files while this thread counts them, carrying
+        the last k-1 bytes of each file separately.
+        batch_size is accepted for compatibility with KmerStore; the
+        codes are counted with a single np.unique at the end.
+        """
+        empty = np.zeros(0, dtype=np.int8)
+        carries = {}  # File index -> base codes carried into its next chunk
+        parts = []
+        with closing(_ingest_chunks(sources, readers, chunk_size, use_mmap, queue_chunks,
+                                    progress)) as chunks:
+            for index, chunk in chunks:
+                codes, carries[index] = self._chunk_codes(carries.get(index, empty), chunk)
+                parts.append(codes)
+
+        if parts:
+            keys, counts = np.unique(np.concatenate(parts), return_counts=True)
+            self._merge(keys, counts.astype(np.int64))
+
+    def batch_insert(self, kmers: list[str]) -> None:
+        """
+        Given a list of m k-mers, insert them into the store
+        (including all duplicates).
+        """
+        keys, counts = np.unique(self._encode_many(kmers), return_counts=True)
+        self._merge(keys, counts.astype(np.int64))
+
+    def batch_delete(self, kmers: list[str]) -> None:
+        """
+        Given a list of m k-mers, delete the matching ones
+        (including all duplicates).
+        """
+        if not kmers or len(self.kmers) == 0:
+            return
+        doomed = np.isin(self.kmers, self._encode_many(kmers))
+        np.subtract.at(self.prefix_count,
+                       (self.kmers[doomed] >> self._prefix_shift).astype(np.intp),
+                       self.frequency[doomed])
+        self.kmers = self.kmers[~doomed]
+        self.frequency = self.frequency[~doomed]
+        self.cumulative = np.cumsum(self.frequency)
+
+    def freq_geq(self, m: int) -> list[str]:
+        """
+        Given an integer m, return a list of k-mers that occur
+        >= m times in your data structure.
+        """
+        return self._decode_many(self.kmers[self.frequency >= m])
+
+    def _total_before(self, indexes: "np.ndarray") -> "np.ndarray":
+        """Sum of frequency[:i] for every i in indexes."""
+        padded = np.concatenate(([0], self.cumulative))
+        return padded[indexes]
+
+    def count(self, kmer: str) -> int:
+        """
+        Given a k-mer, return the number of times it appears in
+        your data structure.
+        """
+        return self.count_many([kmer])[0]
+
+    def count_geq(self, kmer: str) -> int:
+        """
+        Given a k-mer, return the total number of k-mers that
+        are lexicographically greater or equal.
+        """
+        return self.count_geq_many([kmer])[0]
+
+    def count_many(self, kmers: list[str]) -> list[int]:
+        """
+        Batched count, answered with one vectorized searchsorted.
+        """
+        keys = self._encode_many(kmers)
+        n = len(self.kmers)
+        indexes = np.searchsorted(self.kmers, keys)
+        found = indexes < n
+        found[found] = self.kmers[indexes[found]] == keys[found]
+        result = np.zeros(len(keys), dtype=np.int64)
+        result[found] = self.frequency[indexes[found]]
+        return result.tolist()
+
+    def count_geq_many(self, kmers: list[str]) -> list[int]:
+        """
+        Batched count_geq, answered with one vectorized searchsorted.
+        """
+        keys = self._encode_many(kmers, canonical=False)
+        indexes = np.searchsorted(self.kmers, keys)
+        total = int(self.cumulative[-1]) if len(self.cumulative) else 0
+        return (total - self._total_before(indexes)).tolist()
+
+    def compatible(self, kmer: str) -> int:
+        """
+        Given a k-mer, return the total number of compatible
+        k-mers: those whose first `overlap` bases are the complements
+        of the last `overlap` bases of the input.
+        """
+        return self.compatible_many([kmer])[0]
+
+    def compatible_many(self, kmers: list[str]) -> list[int]:
+        """
+        Batched compatible, answered with one vectorized table lookup.
+        """
+        if not kmers:
+            return []
+        j = self.overlap
+        raw = np.frombuffer("".join(kmer[-j:] for kmer in kmers).encode("ascii"), dtype=np.uint8)
+        complements = (3 - _BYTE_TO_CODE[raw].astype(np.int64)).reshape(len(kmers), j)
+        indexes = (complements << np.arange(2 * (j - 1), -1, -2)).sum(axis=1)
+        return self.prefix_count[indexes].tolist()
+
+    def save(self, path: str) -> None:
+        """Write the store to a snapshot file that KmerStore.open can map."""
+        write_snapshot(path, self.k, FLAG_CANONICAL if self.canonical else 0,
+                       self.prefix_count.tolist(), self.kmers.tolist(), self.frequency.tolist())
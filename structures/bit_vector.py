@@ -13,12 +13,14 @@ class BitVector:
     """
     BITS_PER_ELEMENT = 64
 
-    def __init__(self) -> None:
+    def __init__(self, size: int = 0) -> None:
         """
         We will use the dynamic array as our data storage mechanism
+        Pass size to start with that many bits, all set to 0.
         """
-        self._data = DynamicArray()
-        self._size = 0  # Total number of bits in the vector
+        self._data = DynamicArray("Q")  # Unsigned 64-bit words
+        self._data.fill(-(-size // self.BITS_PER_ELEMENT), 0)
+        self._size = size  # Total number of bits in the vector
         self._start_index = 0  # Initialize the start index for logical indexing
         self._flipped = False  # Flag to indicate if the bits are logically flipped
         self._reversed = False  # Flag to indicate if the vector is logically reversed
@@ -39,8 +41,9 @@ class BitVector:
     def _ensure_capacity(self, index: int):
         """Ensure the bit vector has enough capacity to handle the given index."""
         required_size = (index // self.BITS_PER_ELEMENT) + 1
-        while self._data.get_size() < required_size:
-            self._data.append(0)  # Initialize with 0 to avoid NoneType errors
+        if self._data.get_size() < required_size:
+            # Initialize with 0 to avoid NoneType errors
+            self._data.fill(required_size - self._data.get_size(), 0)
     
     def get_at(self, index: int) -> int | None:
         """
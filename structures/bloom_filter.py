@@ -0,0 +1,70 @@
+"""
+Bloom filter over integer keys, stored in a BitVector.
+"""
+
+import math
+
+from structures.bit_vector import BitVector
+from structures.hashing import mix64
+
+
+class BloomFilter:
+    """
+    Approximate set membership. contains() never returns False for a
+    key that was added; for a key that was not, it returns True with
+    probability about (1 - e^(-h * n / m))^h after n insertions into
+    m bits with h hash functions.
+    """
+
+    def __init__(self, num_bits: int, num_hashes: int) -> None:
+        self._bits = BitVector(num_bits)
+        self._num_bits = num_bits
+        self._num_hashes = num_hashes
+
+    @staticmethod
+    def for_capacity(expected_items: int, fp_rate: float) -> "BloomFilter":
+        """
+        Size a filter so that after expected_items insertions the false
+        positive rate is about fp_rate.
+        """
+        expected_items = max(1, expected_items)
+        num_bits = math.ceil(-expected_items * math.log(fp_rate) / (math.log(2) ** 2))
+        num_hashes = max(1, round(num_bits / expected_items * math.log(2)))
+        return BloomFilter(num_bits, num_hashes)
+
+    def _positions(self, key: int) -> list[int]:
+        # Double hashing: h1 + i * h2 behaves like h independent hashes
+        h1 = mix64(key, 1)
+        h2 = mix64(key, 2) | 1
+        return [(h1 + i * h2) % self._num_bits for i in range(self._num_hashes)]
+
+    def add(self, key: int) -> None:
+        """
+        Add a key to the filter.
+        Time complexity: O(h)
+        """
+        for position in self._positions(key):
+            self._bits.set_at(position)
+
+    def contains(self, key: int) -> bool:
+        """
+        Return True if the key may have been added, False if it certainly was not.
+        Time complexity: O(h)
+        """
+        for position in self._positions(key):
+            if not self._bits.get_at(position):
+                return False
+        return True
+
+    def __contains__(self, key: int) -> bool:
+        """
+        Same as contains.
+        Allows to use the `in` operator.
+        """
+        return self.contains(key)
+
+    def get_num_bits(self) -> int:
+        return self._num_bits
+
+    def get_num_hashes(self) -> int:
+        return self._num_hashes
@@ -0,0 +1,64 @@
+"""
+Count-Min sketch over integer keys, stored in a DynamicArray.
+"""
+
+import math
+
+from structures.dynamic_array import DynamicArray
+from structures.hashing import mix64
+
+
+class CountMinSketch:
+    """
+    Approximate counts for a stream of integer keys in a fixed
+    depth x width table of counters. estimate() never underestimates;
+    with width = ceil(e / epsilon) and depth = ceil(ln(1 / delta)) it
+    overestimates by more than epsilon * N (N = total count added) with
+    probability at most delta.
+    """
+
+    def __init__(self, width: int, depth: int) -> None:
+        self._width = width
+        self._depth = depth
+        self._total = 0
+        self._counters = DynamicArray("q")  # Row r occupies [r * width, (r + 1) * width)
+        self._counters.fill(width * depth, 0)
+
+    @staticmethod
+    def for_error(epsilon: float, delta: float) -> "CountMinSketch":
+        """Size a sketch for additive error epsilon * N with probability 1 - delta."""
+        return CountMinSketch(math.ceil(math.e / epsilon), max(1, math.ceil(math.log(1 / delta))))
+
+    def _slots(self, key: int) -> list[int]:
+        return [row * self._width + mix64(key, row + 1) % self._width for row in range(self._depth)]
+
+    def add(self, key: int, count: int = 1) -> int:
+        """
+        Add count occurrences of key and return its new estimate.
+        Time complexity: O(depth)
+        """
+        self._total += count
+        estimate = None
+        for slot in self._slots(key):
+            value = self._counters.get_at(slot) + count
+            self._counters.set_at(slot, value)
+            if estimate is None or value < estimate:
+                estimate = value
+        return estimate
+
+    def estimate(self, key: int) -> int:
+        """
+        Return an upper bound on the number of times key was added.
+        Time complexity: O(depth)
+        """
+        return min(self._counters.get_at(slot) for slot in self._slots(key))
+
+    def total(self) -> int:
+        """Return the total count added to the sketch."""
+        return self._total
+
+    def get_width(self) -> int:
+        return self._width
+
+    def get_depth(self) -> int:
+        return self._depth
@@ -4,11 +4,163 @@ The University of Queensland
 Joel Mackenzie and Vladimir Morozov
 """
 
-from typing import Any
+from array import array
+from bisect import bisect_right
+from itertools import chain
+from typing import Any, Callable, Iterable, Iterator
+
+MIN_RUN = 32  # Natural runs shorter than this are extended by insertion sort
+RADIX_MIN_SIZE = 64  # Below this a merge sort beats setting up radix buckets
+RADIX_MAX_BITS = 64  # Wider keys are merge sorted
+_DNA_DIGITS = str.maketrans("ACGT", "0123")
+
+
+def _radix_codes(keys: list[Any]) -> list[int] | None:
+    """
+    Map sort keys to non-negative integers with the same order, or
+    return None if they are not all ints (or all A/C/G/T strings of one
+    length) within RADIX_MAX_BITS bits.
+    """
+    first = keys[0]
+    if first.__class__ is int:
+        if any(item.__class__ is not int for item in keys):
+            return None
+        low = min(keys)
+        if (max(keys) - low).bit_length() > RADIX_MAX_BITS:
+            return None
+        return [item - low for item in keys] if low else keys
+    if first.__class__ is str:
+        length = len(first)
+        if not 0 < 2 * length <= RADIX_MAX_BITS:
+            return None
+        for item in keys:
+            if item.__class__ is not str or len(item) != length or item.strip("ACGT"):
+                return None
+        # Two bits per base in lexicographic order, so codes compare like the strings
+        return [int(item.translate(_DNA_DIGITS), 4) for item in keys]
+    return None
+
+
+def _radix_sort_ints(codes: list[int]) -> list[int]:
+    """
+    Sort non-negative ints with an LSD radix sort: each pass is a stable
+    distribution on the next digit. Digits get wider as N grows (more
+    buckets pay off only once they fill up) and are spread evenly over
+    the key width so that no pass is wasted on a sliver of bits.
+    """
+    width = max(codes).bit_length()
+    if width == 0:
+        return codes
+    digit = min(12, max(8, len(codes).bit_length() - 6))
+    passes = -(-width // digit)
+    bits = -(-width // passes)
+    mask = (1 << bits) - 1
+    for shift in range(0, width, bits):
+        buckets = [[] for _ in range(mask + 1)]
+        appends = [bucket.append for bucket in buckets]
+        for code in codes:
+            appends[(code >> shift) & mask](code)
+        codes = list(chain.from_iterable(buckets))
+    return codes
+
+
+def _natural_merge_sort(items: list[Any]) -> None:
+    """
+    Stable in-place sort of a list using only <. The ascending and
+    strictly descending runs already in the data are found first (the
+    latter reversed), short runs are extended to MIN_RUN by binary
+    insertion, and runs are then merged pairwise, bottom up, between the
+    list and a single scratch buffer. Sorted input costs O(N).
+    """
+    n = len(items)
+    bounds = [0]
+    i = 0
+    while i < n:
+        j = i + 1
+        if j < n and items[j] < items[i]:
+            while j < n and items[j] < items[j - 1]:
+                j += 1
+            items[i:j] = items[i:j][::-1]
+        else:
+            while j < n and not items[j] < items[j - 1]:
+                j += 1
+        end = min(n, i + MIN_RUN)
+        while j < end:
+            item = items[j]
+            position = bisect_right(items, item, i, j)
+            items[position + 1:j + 1] = items[position:j]
+            items[position] = item
+            j += 1
+        bounds.append(j)
+        i = j
+
+    source, target = items, [None] * n
+    while len(bounds) > 2:
+        merged = [0]
+        for r in range(0, len(bounds) - 2, 2):
+            _merge_into(source, target, bounds[r], bounds[r + 1], bounds[r + 2])
+            merged.append(bounds[r + 2])
+        if len(bounds) % 2 == 0:
+            # Odd number of runs: the last one is carried over as it is
+            target[bounds[-2]:] = source[bounds[-2]:]
+            merged.append(n)
+        bounds = merged
+        source, target = target, source
+    if source is not items:
+        items[:] = source
+
+
+def _merge_into(source: list[Any], target: list[Any], low: int, middle: int, high: int) -> None:
+    """Merge the sorted runs source[low:middle] and source[middle:high] into target."""
+    if not source[middle] < source[middle - 1]:
+        target[low:high] = source[low:high]  # Already in order
+        return
+    i, j, k = low, middle, low
+    left, right = source[i], source[j]
+    while True:
+        if right < left:
+            target[k] = right
+            k += 1
+            j += 1
+            if j == high:
+                break
+            right = source[j]
+        else:
+            target[k] = left
+            k += 1
+            i += 1
+            if i == middle:
+                break
+            left = source[i]
+    if i < middle:
+        target[k:high] = source[i:middle]
+    else:
+        target[k:high] = source[j:high]
 
 
 class DynamicArray:
-    def __init__(self) -> None:
+    """
+    A growable array stored in a ring buffer, so appending and
+    prepending are both O(1*) and reverse() is O(1). insert_at and
+    remove_at shift whichever side of the index is shorter, and
+    remove_if/retain filter the whole array in one pass.
+
+    By default any Python objects can be stored. Passing an `array`
+    module typecode (e.g. DynamicArray("q") for signed 64-bit ints)
+    keeps the elements unboxed in a typed buffer instead, at
+    array(typecode).itemsize bytes per slot rather than a pointer plus
+    an int object. Storing a value the typecode cannot represent then
+    raises TypeError or OverflowError, and removed slots are cleared to
+    0 instead of None.
+
+    The capacity doubles when the array is full and halves when removals
+    leave it a quarter full. reserve(n) pre-sizes the buffer when the
+    final size is known and shrink_to_fit() drops all spare slots.
+    """
+    def __init__(self, typecode: str | None = None) -> None:
+        self._typecode = typecode  # array module typecode, or None for a plain list
+        if typecode is not None:
+            array(typecode)  # Fail early on an unknown typecode
         self._capacity = 1  # Initial capacity of the dynamic array
         self._size = 0       # Number of elements currently in the array
         self._data = self._make_array(self._capacity)
@@ -33,31 +185,60 @@ class DynamicArray:
 
     def __resize(self, new_capacity) -> None:
         new_data = self._make_array(new_capacity)
-        for i in range(self._size):
-            new_data[i] = self._data[(self._start_index + i) % self._capacity]
+        new_data[:self._size] = self._physical()
         self._data = new_data
         self._capacity = new_capacity
         self._start_index = 0
 
+    def reserve(self, n: int) -> None:
+        """
+        Make room for at least n elements in total, so that growing the
+        array up to n elements does not resize it again.
+        Time complexity: O(N) if the array has to grow, else O(1)
+        """
+        if n > self._capacity:
+            self.__resize(n)
+
+    def shrink_to_fit(self) -> None:
+        """
+        Release every unused slot, leaving the capacity equal to the size.
+        Time complexity: O(N)
+        """
+        if self._capacity > max(1, self._size):
+            self.__resize(max(1, self._size))
+
+    def _shrink_if_sparse(self) -> None:
+        # Halve the capacity once the array is a quarter full. Growth doubles
+        # when full, so after either resize at least N/4 more operations are
+        # needed before the next one, which keeps removals O(1*) as well.
+        # A bulk removal may call for several halvings; they are done in one go.
+        capacity = self._capacity
+        while capacity > 1 and self._size <= capacity // 4:
+            capacity //= 2
+        if capacity != self._capacity:
+            self.__resize(capacity)
+
     def get_at(self, index: int) -> Any | None:
         """
         Get element at the given index.
         Return None if index is out of bounds.
         Time complexity for full marks: O(1)
         """
-        i=0
-        if i == index < self._size and i<index:
+        if 0 <= index < self._size:
             if self._reversed:
                 return self._data[(self._start_index + self._size - 1 - index) % self._capacity]
             else:
                 return self._data[(self._start_index + index) % self._capacity]
         return None
 
-    def __getitem__(self, index: int) -> Any | None:
+    def __getitem__(self, index: int | slice) -> Any | None:
         """
         Same as get_at.
         Allows to use square brackets to index elements.
+        A slice returns an ArrayView over those positions instead of a copy.
         """
+        if isinstance(index, slice):
+            return ArrayView(self, range(self._size)[index])
         return self.get_at(index)
 
     def set_at(self, index: int, element: Any) -> None:
@@ -94,6 +275,105 @@ class DynamicArray:
             self._data[(self._start_index + self._size) % self._capacity] = element
         self._size += 1
 
+    def extend(self, elements: Iterable[Any]) -> None:
+        """
+        Add every element of an iterable (or another DynamicArray) to the
+        back of the array, in order. The array grows at most once and the
+        elements are copied in slices rather than one append at a time.
+        Time complexity: O(M*) for M new elements
+        """
+        if self._typecode is not None:
+            self._extend_values(array(self._typecode, elements))
+        else:
+            self._extend_values(list(elements))
+
+    def fill(self, n: int, value: Any) -> None:
+        """
+        Add n copies of value to the back of the array.
+        Time complexity: O(n*)
+        """
+        if self._typecode is not None:
+            self._extend_values(array(self._typecode, [value]) * n)
+        else:
+            self._extend_values([value] * n)
+
+    @staticmethod
+    def from_iterable(elements: Iterable[Any], typecode: str | None = None) -> "DynamicArray":
+        """Build a DynamicArray holding the given elements, in order."""
+        result = DynamicArray(typecode)
+        result.extend(elements)
+        return result
+
+    def _extend_values(self, values: list | array) -> None:
+        count = len(values)
+        if count == 0:
+            return
+        if self._size + count > self._capacity:
+            self.__resize(max(2 * self._capacity, self._size + count))
+        if self._reversed:
+            # The back of a reversed array grows towards the physical front
+            self._start_index = (self._start_index - count) % self._capacity
+            self._write_run(self._start_index, values[::-1])
+        else:
+            self._write_run((self._start_index + self._size) % self._capacity, values)
+        self._size += count
+
+    def _write_run(self, position: int, values: list | array) -> None:
+        # Copy values into consecutive physical slots from position, wrapping around
+        first = min(len(values), self._capacity - position)
+        self._data[position:position + first] = values[:first]
+        self._data[:len(values) - first] = values[first:]
+
+    def _physical(self) -> list | array:
+        """A copy of the occupied slots, starting at _start_index."""
+        end = self._start_index + self._size
+        if end <= self._capacity:
+            return self._data[self._start_index:end]
+        return self._data[self._start_index:] + self._data[:end - self._capacity]
+
+    def _logical(self) -> list | array:
+        """A copy of the elements in logical order (an array when typed)."""
+        items = self._physical()
+        return items[::-1] if self._reversed else items
+
+    def _normalize(self) -> None:
+        """Rearrange the buffer so that logical index i is in physical slot i."""
+        if self._start_index == 0 and not self._reversed:
+            return
+        data = self._make_array(self._capacity)
+        data[:self._size] = self._logical()
+        self._data = data
+        self._start_index = 0
+        self._reversed = False
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over a snapshot of the elements in logical order."""
+        return iter(self._logical())
+
+    def to_list(self) -> list[Any]:
+        """
+        Return the elements as a Python list, in logical order.
+        Time complexity: O(N)
+        """
+        return list(self._logical())
+
+    def as_memoryview(self) -> memoryview:
+        """
+        Expose the elements of a typed array through the buffer protocol
+        without copying them, e.g. for numpy.frombuffer or file.write.
+        A wrapped or reversed buffer is first rearranged into logical
+        order, which costs O(N) once. The view is only valid until the
+        array next grows or is rearranged.
+        """
+        if self._typecode is None:
+            raise TypeError("only a typed DynamicArray can export a buffer")
+        self._normalize()
+        return memoryview(self._data)[:self._size]
+
+    def __buffer__(self, flags: int) -> memoryview:
+        # Buffer protocol hook (Python 3.12+), so memoryview(array) works directly
+        return self.as_memoryview()
+
     def prepend(self, element: Any) -> None:
         """
         Add an element to the front of the array.
@@ -117,6 +397,33 @@ class DynamicArray:
         self._reversed = not self._reversed
 
 
+    def insert_at(self, index: int, element: Any) -> None:
+        """
+        Insert an element so that it ends up at the given index.
+        Index get_size() appends. Do not modify the array if the index
+        is out of bounds. Only the elements on the shorter side of the
+        index are shifted, towards the free slots of the ring buffer.
+        Time complexity: O(min(index, N - index)*)
+        """
+        if not 0 <= index <= self._size:
+            return
+        if self._size == self._capacity:
+            self.__resize(2 * self._capacity)
+        data, capacity, start = self._data, self._capacity, self._start_index
+        # Position of the new element in physical order, counted from _start_index
+        position = self._size - index if self._reversed else index
+        if position < self._size - position:
+            # Move the front part one slot back, into the free slot before it
+            start = (start - 1) % capacity
+            for t in range(position):
+                data[(start + t) % capacity] = data[(start + t + 1) % capacity]
+            self._start_index = start
+        else:
+            for t in range(self._size, position, -1):
+                data[(start + t) % capacity] = data[(start + t - 1) % capacity]
+        data[(start + position) % capacity] = element
+        self._size += 1
+
     def remove(self, element: Any) -> None:
         """
         Remove the first occurrence of the element from the array.
@@ -124,29 +431,69 @@ class DynamicArray:
         Time complexity for full marks: O(N)
         """
         for i in range(self._size):
-            if self._data[i] == element:
-                # Shift elements to the left to fill the gap
-                for j in range(i, self._size - 1):
-                    self._data[j] = self._data[j + 1]
-                self._data[self._size - 1] = None  # Remove reference
-                self._size -= 1
+            if self.get_at(i) == element:
+                self.remove_at(i)
                 break
 
     def remove_at(self, index: int) -> Any | None:
         """
         Remove the element at the given index from the array and return the removed element.
         If there is no such element, leave the array unchanged and return None.
-        Time complexity for full marks: O(N)
+        Only the elements on the shorter side of the index are shifted
+        to close the gap.
+        Time complexity: O(min(index, N - index)*)
         """
-        if 0 <= index < self._size:
-            removed_element = self._data[index]
-            # Shift elements to the left to fill the gap
-            for i in range(index, self._size - 1):
-                self._data[i] = self._data[i + 1]
-            self._data[self._size - 1] = None  # Remove reference
-            self._size -= 1
-            return removed_element
-        return None
+        if not 0 <= index < self._size:
+            return None
+        data, capacity, start = self._data, self._capacity, self._start_index
+        position = self._size - 1 - index if self._reversed else index
+        removed_element = data[(start + position) % capacity]
+        if position < self._size - 1 - position:
+            # Shift the front part forwards and drop the first slot
+            for t in range(position, 0, -1):
+                data[(start + t) % capacity] = data[(start + t - 1) % capacity]
+            data[start] = self._vacant()  # Remove reference
+            self._start_index = (start + 1) % capacity
+        else:
+            for t in range(position, self._size - 1):
+                data[(start + t) % capacity] = data[(start + t + 1) % capacity]
+            data[(start + self._size - 1) % capacity] = self._vacant()  # Remove reference
+        self._size -= 1
+        self._shrink_if_sparse()
+        return removed_element
+
+    def remove_if(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        Remove every element for which predicate(element) is true and
+        return how many were removed. The survivors keep their order and
+        are compacted in a single pass, so this is O(N) however many
+        elements go, instead of O(N) per remove_at.
+        Time complexity: O(N)
+        """
+        self._normalize()
+        data, size = self._data, self._size
+        write = 0
+        for read in range(size):
+            item = data[read]
+            if not predicate(item):
+                if write != read:
+                    data[write] = item
+                write += 1
+        removed = size - write
+        if removed:
+            # Remove references (typed buffers are zeroed instead)
+            data[write:size] = [None] * removed if self._typecode is None else self._make_array(removed)
+            self._size = write
+            self._shrink_if_sparse()
+        return removed
+
+    def retain(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        Keep only the elements for which predicate(element) is true and
+        return how many were removed. Same single pass as remove_if.
+        Time complexity: O(N)
+        """
+        return self.remove_if(lambda item: not predicate(item))
 
     def is_empty(self) -> bool:
         """
@@ -169,6 +516,13 @@ class DynamicArray:
         """
         return self._size
 
+    def get_typecode(self) -> str | None:
+        """
+        Return the array module typecode of the storage,
+        or None if the array holds arbitrary objects.
+        """
+        return self._typecode
+
     def get_capacity(self) -> int:
         """
         Return the total capacity (the number of slots) of the list
@@ -176,50 +530,106 @@ class DynamicArray:
         """
         return self._capacity
 
-    def sort(self) -> None:
+    def sort(self, key: Callable[[Any], Any] | None = None) -> None:
         """
-        Sort elements inside _data based on < comparisons.
+        Sort elements inside _data based on < comparisons, or on the
+        < comparisons of key(element) if a key function is given.
+        The sort is stable and works on the logical order, so wrapped
+        and reversed buffers are laid out from slot 0 first.
+        Integer keys and fixed-length DNA strings (A/C/G/T only) use an
+        LSD radix sort, O(N * w) for w passes of 8 to 12-bit digits
+        (wider for larger N) spread evenly over the key width; any
+        other keys use a natural merge sort.
         Time complexity for full marks: O(NlogN)
         """
-        if self._size > 1:
-            self._merge_sort(0, self._size - 1)
-
-    def _merge_sort(self, left: int, right: int) -> None:
-        if left < right:
-            middle = (left + right) // 2
-            self._merge_sort(left, middle)
-            self._merge_sort(middle + 1, right)
-            self._merge(left, middle, right)
-
-    def _merge(self, left: int, middle: int, right: int) -> None:
-        # Create temporary arrays
-        left_half = self._data[left:middle + 1]
-        right_half = self._data[middle + 1:right + 1]
-
-        i = j = 0
-        k = left
-
-        # Merge the temp arrays back into the original array
-        while i < len(left_half) and j < len(right_half):
-            if left_half[i] <= right_half[j]:
-                self._data[k] = left_half[i]
-                i += 1
-            else:
-                self._data[k] = right_half[j]
-                j += 1
-            k += 1
+        n = self._size
+        if n < 2:
+            return
+        self._normalize()
+        items = list(self._data[:n])
+        keys = items if key is None else [key(item) for item in items]
+        codes = _radix_codes(keys) if n >= RADIX_MIN_SIZE else None
 
-        # Copy the remaining elements of left_half, if any
-        while i < len(left_half):
-            self._data[k] = left_half[i]
-            i += 1
-            k += 1
+        if codes is not None and key is None and items[0].__class__ is int:
+            low = min(items)  # The codes are offset by the minimum
+            items = _radix_sort_ints(codes)
+            if low:
+                items = [code + low for code in items]
+        elif codes is not None and key is None:
+            # Equal codes are equal strings, so each code maps back to one string
+            strings = dict(zip(codes, items))
+            items = [strings[code] for code in _radix_sort_ints(codes)]
+        elif codes is not None:
+            # Append the position to every code: the codes become distinct and
+            # ties keep their original order
+            shift = n.bit_length()
+            mask = (1 << shift) - 1
+            order = _radix_sort_ints([(code << shift) | i for i, code in enumerate(codes)])
+            items = [items[combined & mask] for combined in order]
+        elif key is None:
+            _natural_merge_sort(items)
+        else:
+            # Decorate with positions so that only keys are ever compared
+            decorated = [(item_key, i) for i, item_key in enumerate(keys)]
+            _natural_merge_sort(decorated)
+            items = [items[i] for _, i in decorated]
+
+        self._data[:n] = items if self._typecode is None else array(self._typecode, items)
+
+    def _vacant(self) -> Any:
+        # What a removed slot is cleared to; typed buffers cannot hold None
+        return None if self._typecode is None else 0
 
-        # Copy the remaining elements of right_half, if any
-        while j < len(right_half):
-            self._data[k] = right_half[j]
-            j += 1
-            k += 1
     def _make_array(self, capacity):
         # Returns a new array with the given capacity
+        if self._typecode is not None:
+            return array(self._typecode, [0]) * capacity
         return [0] * capacity
+
+
+class ArrayView:
+    """
+    A window onto a range of positions of a DynamicArray, as returned by
+    slicing it. Nothing is copied: reads and writes go straight to the
+    array. The positions are fixed when the view is made, so a view
+    should not be kept across inserts or removals.
+    """
+    def __init__(self, source: DynamicArray, positions: range) -> None:
+        self._source = source
+        self._positions = positions
+
+    def get_at(self, index: int) -> Any | None:
+        """
+        Get element at the given index of the view.
+        Return None if index is out of bounds.
+        """
+        if 0 <= index < len(self._positions):
+            return self._source.get_at(self._positions[index])
+        return None
+
+    def __getitem__(self, index: int | slice) -> Any | None:
+        if isinstance(index, slice):
+            return ArrayView(self._source, self._positions[index])
+        return self.get_at(index)
+
+    def set_at(self, index: int, element: Any) -> None:
+        """
+        Set element at the given index of the view.
+        Do not modify anything if the index is out of bounds.
+        """
+        if 0 <= index < len(self._positions):
+            self._source.set_at(self._positions[index], element)
+
+    def __setitem__(self, index: int, element: Any) -> None:
+        self.set_at(index, element)
+
+    def __iter__(self) -> Iterator[Any]:
+        source = self._source
+        for position in self._positions:
+            yield source.get_at(position)
+
+    def to_list(self) -> list[Any]:
+        return list(self)
+
+    def get_size(self) -> int:
+        return len(self._positions)
@@ -0,0 +1,79 @@
+"""
+Fenwick tree (binary indexed tree) over a sequence of integers.
+"""
+
+from structures.dynamic_array import DynamicArray
+
+
+class FenwickTree:
+    """
+    Maintains running sums over a sequence of integers so that prefix
+    sums and point updates both cost O(log N).
+    Slot 0 of the underlying DynamicArray is unused; slot i covers the
+    (i & -i) values ending at position i (1-based).
+    """
+
+    def __init__(self) -> None:
+        self._tree = DynamicArray("q")
+        self._tree.append(0)
+        self._size = 0  # Number of values covered by the tree
+        self._total = 0  # Sum of all values, kept for O(1) total()
+
+    def build(self, values: DynamicArray) -> None:
+        """
+        Replace the contents of the tree with the given values.
+        Time complexity: O(N)
+        """
+        tree = DynamicArray("q")
+        tree.append(0)
+        tree.extend(values)
+        size = values.get_size()
+        total = sum(tree)  # Slot 0 holds 0
+        # Push each slot's partial sum up to its parent once
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree.set_at(parent, tree.get_at(parent) + tree.get_at(i))
+        self._tree = tree
+        self._size = size
+        self._total = total
+
+    def add(self, index: int, delta: int) -> None:
+        """
+        Add delta to the value at the given (0-based) index.
+        Do nothing if the index is out of bounds.
+        Time complexity: O(log N)
+        """
+        if index < 0 or index >= self._size:
+            return
+        self._total += delta
+        i = index + 1
+        while i <= self._size:
+            self._tree.set_at(i, self._tree.get_at(i) + delta)
+            i += i & -i
+
+    def prefix_sum(self, index: int) -> int:
+        """
+        Return the sum of the first `index` values.
+        Time complexity: O(log N)
+        """
+        i = min(index, self._size)
+        result = 0
+        while i > 0:
+            result += self._tree.get_at(i)
+            i -= i & -i
+        return result
+
+    def total(self) -> int:
+        """
+        Return the sum of all values.
+        Time complexity: O(1)
+        """
+        return self._total
+
+    def get_size(self) -> int:
+        """
+        Return the number of values covered by the tree.
+        Time complexity: O(1)
+        """
+        return self._size
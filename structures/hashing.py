@@ -0,0 +1,17 @@
+"""
+Hash functions for integer keys, shared by the probabilistic structures.
+"""
+
+MASK64 = (1 << 64) - 1
+
+
+def mix64(key: int, seed: int = 0) -> int:
+    """
+    Scramble a non-negative integer into 64 well-mixed bits
+    (the splitmix64 finalizer applied to key + seed).
+    Time complexity: O(1) for keys up to 64 bits
+    """
+    x = (key + seed * 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
@@ -0,0 +1,180 @@
+"""
+Opt-in operation counters and timing for DynamicArray, BitVector and KmerStore.
+
+Nothing here touches the instrumented classes until enable() is called:
+enable() swaps the listed methods for counting/timing wrappers and
+disable() puts the originals back, so there is no cost at all while
+instrumentation is off.
+
+    from structures import instrumentation
+    instrumentation.enable()
+    store.read("dna.txt")
+    print(instrumentation.stats())
+    instrumentation.disable()
+"""
+
+import time
+from collections import Counter
+from typing import Any, Callable
+
+from structures.bit_vector import BitVector
+from structures.dynamic_array import DynamicArray
+
+Probe = Callable[..., None]
+
+
+def _resize_probe(array: DynamicArray, counters: Counter, new_capacity: int) -> None:
+    counters["dynamic_array.resizes"] += 1
+    counters["dynamic_array.element_copies"] += array.get_size()
+
+
+def _shift_probe(store: Any, counters: Counter, index: int, key: Any) -> None:
+    # DynamicArray.insert_at moves the shorter side, in both arrays
+    counters["kmer_store.element_shifts"] += min(index, store.kmers.get_size() - index)
+
+
+def _search_probe(store: Any, counters: Counter, key: Any, low: int = 0,
+                  high: int | None = None) -> None:
+    if high is None:
+        high = store.kmers.get_size() - 1
+    # A binary search over s positions makes at most s.bit_length() comparisons
+    counters["kmer_store.comparisons"] += max(0, high - low + 1).bit_length()
+    counters["kmer_store.binary_searches"] += 1
+
+
+def _merge_probe(store: Any, counters: Counter, keys: list[Any], counts: list[int]) -> None:
+    counters["kmer_store.element_copies"] += store.kmers.get_size() + len(keys)
+
+
+DYNAMIC_ARRAY_METHODS = {
+    "get_at": None, "set_at": None, "append": None, "prepend": None, "reverse": None,
+    "insert_at": None, "remove": None, "remove_at": None, "remove_if": None, "retain": None,
+    "extend": None, "fill": None, "reserve": None, "shrink_to_fit": None, "sort": None,
+    "_DynamicArray__resize": _resize_probe,
+}
+
+BIT_VECTOR_METHODS = {
+    "get_at": None, "set_at": None, "unset_at": None, "append": None, "prepend": None,
+    "reverse": None, "flip_all_bits": None, "shift": None, "rotate": None,
+}
+
+KMER_STORE_METHODS = {
+    "read": None, "read_parallel": None, "ingest": None, "batch_insert": None, "batch_delete": None,
+    "count": None, "count_geq": None, "count_many": None, "count_geq_many": None,
+    "freq_geq": None, "compatible": None, "compatible_many": None,
+    "_insert_at_position": _shift_probe,
+    "_binary_search_insert_position": _search_probe,
+    "_merge_counted": _merge_probe,
+}
+
+
+class Instrumentation:
+    """
+    Wraps methods of classes with call counters, cumulative latency and
+    optional probes that derive extra counters (resizes, copies,
+    comparisons, ...) from each call's arguments.
+    """
+
+    def __init__(self) -> None:
+        self.calls = Counter()
+        self.seconds = Counter()
+        self.counters = Counter()
+        self._originals = {}  # (class, method name) -> original function
+
+    def instrument(self, cls: type, methods: dict[str, Probe | None], timing: bool = True) -> None:
+        """Replace the given methods of cls with instrumented wrappers."""
+        for name, probe in methods.items():
+            if (cls, name) in self._originals or name not in cls.__dict__:
+                continue
+            original = cls.__dict__[name]
+            self._originals[(cls, name)] = original
+            label = f"{cls.__name__}.{name.replace(f'_{cls.__name__}__', '__')}"
+            setattr(cls, name, self._wrap(label, original, probe, timing))
+
+    def _wrap(self, label: str, original: Callable, probe: Probe | None,
+              timing: bool) -> Callable:
+        calls, seconds, counters = self.calls, self.seconds, self.counters
+        perf_counter = time.perf_counter
+
+        def wrapper(obj: Any, *args: Any, **kwargs: Any) -> Any:
+            calls[label] += 1
+            if probe is not None:
+                probe(obj, counters, *args, **kwargs)
+            if not timing:
+                return original(obj, *args, **kwargs)
+            start = perf_counter()
+            try:
+                return original(obj, *args, **kwargs)
+            finally:
+                seconds[label] += perf_counter() - start
+
+        wrapper.__name__ = original.__name__
+        wrapper.__doc__ = original.__doc__
+        wrapper.__wrapped__ = original
+        return wrapper
+
+    def restore(self) -> None:
+        """Put every original method back."""
+        for (cls, name), original in self._originals.items():
+            setattr(cls, name, original)
+        self._originals = {}
+
+    def reset(self) -> None:
+        """Zero all counters without touching the wrappers."""
+        self.calls.clear()
+        self.seconds.clear()
+        self.counters.clear()
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """
+        Snapshot of everything recorded so far. Latencies are inclusive:
+        time spent in instrumented methods called from an instrumented
+        method is counted in both.
+        """
+        return {
+            "calls": dict(self.calls),
+            "seconds": dict(self.seconds),
+            "mean_seconds": {name: self.seconds[name] / self.calls[name]
+                             for name in self.seconds if self.calls[name]},
+            "counters": dict(self.counters),
+        }
+
+
+_active = None
+
+
+def enable(timing: bool = True) -> Instrumentation:
+    """
+    Instrument DynamicArray, BitVector and KmerStore. Pass timing=False
+    to only count calls, which costs much less per call.
+    """
+    global _active
+    if _active is None:
+        _active = Instrumentation()
+        _active.instrument(DynamicArray, DYNAMIC_ARRAY_METHODS, timing)
+        _active.instrument(BitVector, BIT_VECTOR_METHODS, timing)
+        # Imported here so the structures package does not depend on malloclabs
+        from malloclabs.kmer_structure import KmerStore
+        _active.instrument(KmerStore, KMER_STORE_METHODS, timing)
+    return _active
+
+
+def disable() -> None:
+    """Restore the original methods; instrumentation costs nothing again."""
+    global _active
+    if _active is not None:
+        _active.restore()
+        _active = None
+
+
+def reset() -> None:
+    """Zero the counters of the active instrumentation, if any."""
+    if _active is not None:
+        _active.reset()
+
+
+def stats() -> dict[str, dict[str, float]]:
+    """Counters of the active instrumentation, or empty dicts when disabled."""
+    if _active is None:
+        return {"calls": {}, "seconds": {}, "mean_seconds": {}, "counters": {}}
+    return _active.stats()
@@ -60,8 +60,7 @@ def main_character(instring: list[int]) -> int:
     # DynamicArray to act as our hash map
     size = 1000000  # This size can be adjusted for better performance
     hash_map = DynamicArray()
-    for _ in range(size):
-        hash_map.append(None)  # Initialize with None (meaning no element has been seen)
+    hash_map.fill(size, None)  # Initialize with None (meaning no element has been seen)
 
     for index, number in enumerate(instring):
         hashed_index = hash_function(number, size)